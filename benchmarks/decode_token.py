@@ -0,0 +1,46 @@
+"""
+Micro-benchmark of access token decoding.
+
+Compares the pydantic path (`JWTPayload` -> `model_dump` -> `TokenData`) with the
+claims path used by `JWTTokenStorage` for access tokens.
+
+Run: python benchmarks/decode_token.py
+"""
+
+import timeit
+
+from fastauth.schemas.auth import TokenData, TokenType
+from fastauth.settings import FastAuthSettings
+from fastauth.storage import JWTTokenStorage
+from fastauth.utils.jwt_helper import to_jwt_payload
+
+NUMBER = 20_000
+
+settings = FastAuthSettings(SECRET_KEY="benchmark")
+storage = JWTTokenStorage(settings)
+token = storage.encode_token(
+    TokenData(
+        user_id="7d3f6b8e-6c1a-4a57-9f0e-0b9c3c2f4e11",
+        email="user@example.com",
+        roles=["USER", "EDITOR"],
+        permissions=[f"resource{i}:read" for i in range(20)],
+        token_type=TokenType.ACCESS,
+        expires_in=3600,
+        jti="5b0c2c58-2f3a-4a43-8a8b-6c2b0e3f9d71",
+    )
+)
+
+
+def pydantic_decode():
+    decoded = to_jwt_payload(settings, token, audience=settings.ACCESS_TOKEN_AUDIENCE)
+    return TokenData(**decoded.model_dump(), user_id=decoded.sub)
+
+
+def claims_decode():
+    return storage.decode_token(token)
+
+
+if __name__ == "__main__":
+    for name, func in (("pydantic", pydantic_decode), ("claims", claims_decode)):
+        best = min(timeit.repeat(func, number=NUMBER, repeat=5))
+        print(f"{name:>10}: {best / NUMBER * 1e6:.2f} us/token")
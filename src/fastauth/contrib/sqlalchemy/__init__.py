@@ -18,6 +18,8 @@ from .models import (
     BaseUUIDOAuthAccount,
     BaseOAuthAccount,
     OAuthMixin,
+    BaseRevokedTokenModel,
+    TokenVersionMixin,
 )
 from .repositories import (
     SQLAlchemyBaseRepository,
@@ -26,6 +28,8 @@ from .repositories import (
     SQLAlchemyPermissionRepository,
     SQLAlchemyRoleRepository,
 )
+from .revocation import SQLAlchemyRevocationBackend
+from .loaders import SQLAlchemyUserLoader
 
 __all__ = [
     "BaseUserModel",
@@ -40,9 +44,13 @@ __all__ = [
     "BaseUUIDOAuthAccount",
     "BaseOAuthAccount",
     "OAuthMixin",
+    "BaseRevokedTokenModel",
+    "TokenVersionMixin",
     "SQLAlchemyBaseRepository",
     "SQLAlchemyUserRepository",
     "SQLAlchemyOAuthRepository",
     "SQLAlchemyPermissionRepository",
     "SQLAlchemyRoleRepository",
+    "SQLAlchemyRevocationBackend",
+    "SQLAlchemyUserLoader",
 ]
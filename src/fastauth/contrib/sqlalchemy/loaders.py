@@ -0,0 +1,106 @@
+import asyncio
+from typing import Generic, Any
+
+from sqlalchemy import select, inspect
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlalchemy.orm import selectinload
+
+from fastauth.models import UM
+from fastauth.types import ID
+
+
+class SQLAlchemyUserLoader(Generic[UM, ID]):
+    """
+    DataLoader for users. Collects `load` calls made within one event loop tick
+    (or `delay` seconds) and fetches them by single `WHERE id IN (...)` query,
+    with roles and permissions selectin-loaded for the whole batch.
+
+    Loader is shared between requests, so it uses own sessions and returns
+    detached instances. Instance is shared by all callers of the batch, treat it as
+    read-only: `SQLAlchemyUserRepository` merges it into session of every caller.
+
+    :param session_factory: Factory of sessions used for batch queries
+    :param model: User model
+    :param max_batch_size: Max number of ids in one query
+    :param delay: Seconds to wait for more calls before querying
+    """
+
+    def __init__(
+        self,
+        session_factory: async_sessionmaker[AsyncSession],
+        model: type[UM],
+        max_batch_size: int = 500,
+        delay: float = 0,
+    ):
+        self.session_factory = session_factory
+        self.model = model
+        self.max_batch_size = max_batch_size
+        self.delay = delay
+        self._pending: dict[ID, asyncio.Future] = {}
+        self._scheduled = False
+        self._tasks: set[asyncio.Task] = set()
+
+        self.loads = 0
+        self.batches = 0
+
+    async def load(self, pk: ID) -> UM | None:
+        loop = asyncio.get_running_loop()
+        self.loads += 1
+        future = self._pending.get(pk)
+        if future is None:
+            future = self._pending[pk] = loop.create_future()
+            if not self._scheduled:
+                self._scheduled = True
+                if self.delay:
+                    loop.call_later(self.delay, self._dispatch)
+                else:
+                    loop.call_soon(self._dispatch)
+        return await asyncio.shield(future)
+
+    def _dispatch(self) -> None:
+        self._scheduled = False
+        pending, self._pending = list(self._pending.items()), {}
+        for i in range(0, len(pending), self.max_batch_size):
+            task = asyncio.create_task(
+                self._load_batch(dict(pending[i : i + self.max_batch_size]))
+            )
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _load_batch(self, batch: dict[ID, asyncio.Future]) -> None:
+        self.batches += 1
+        pk_column = inspect(self.model).primary_key[0]
+        qs = (
+            select(self.model)
+            .where(pk_column.in_(list(batch)))
+            .options(*self._load_options())
+        )
+        try:
+            async with self.session_factory() as session:
+                result = await session.scalars(qs)
+                users = {
+                    getattr(user, pk_column.key): user for user in result.unique().all()
+                }
+            for pk, future in batch.items():
+                if not future.done():
+                    future.set_result(users.get(pk))
+        except Exception as e:
+            for future in batch.values():
+                if not future.done():
+                    future.set_exception(e)
+                    future.exception()
+        finally:
+            # Batch cancelled or interrupted, callers must not wait forever
+            for future in batch.values():
+                if not future.done():
+                    future.cancel()
+
+    def _load_options(self) -> list[Any]:
+        relationships = inspect(self.model).relationships
+        if "roles" not in relationships:
+            return []
+        option = selectinload(self.model.roles)
+        role_mapper = relationships["roles"].mapper
+        if "permissions" in role_mapper.relationships:
+            option = option.selectinload(role_mapper.class_.permissions)
+        return [option]
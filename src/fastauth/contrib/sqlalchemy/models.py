@@ -4,7 +4,7 @@ from fastauth.models import IPermission, PM, RM, OAM
 from fastauth.types import ID
 from typing import Generic, TYPE_CHECKING, TypeVar
 from sqlalchemy.orm import Mapped, mapped_column, relationship, declared_attr
-from sqlalchemy import String, Boolean, UniqueConstraint, ForeignKey, Integer
+from sqlalchemy import String, Boolean, UniqueConstraint, ForeignKey, Integer, Float
 from fastauth.contrib.sqlalchemy._generic import GUID
 
 RID = TypeVar("RID")
@@ -124,6 +124,21 @@ class BaseUUIDOAuthAccount(BaseOAuthAccount[uuid.UUID]):
     )
 
 
+class BaseRevokedTokenModel:
+    __tablename__ = "revoked_tokens"
+    __abstract__ = True
+
+    jti: Mapped[str] = mapped_column(String(255), primary_key=True)
+    expires_at: Mapped[float | None] = mapped_column(Float, index=True)
+    revoked_at: Mapped[float] = mapped_column(Float, index=True)
+
+
+class TokenVersionMixin:
+    __abstract__ = True
+
+    token_version: Mapped[int] = mapped_column(Integer, default=0, server_default="0")
+
+
 class RBACMixin(Generic[RM]):
     __abstract__ = True
 
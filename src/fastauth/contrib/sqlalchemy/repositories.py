@@ -1,17 +1,102 @@
-from fastauth.repositories.base import IBaseRepository
+from fastauth.repositories.base import IBaseRepository, LoadStrategy
 from fastauth.repositories.oauths import IOAuthRepository
 from fastauth.repositories.users import IUserRepository
 from fastauth.repositories.roles import IRoleRepository, IPermissionRepository
 from fastauth.models import M, UM, UOAM, OAM, RM, PM
 from fastauth.types import ID
-from typing import Generic, Any
+from typing import AsyncIterator, Generic, Any
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, or_
+from sqlalchemy import (
+    select,
+    insert,
+    update,
+    or_,
+    inspect,
+    tuple_,
+    event,
+    bindparam,
+    func,
+)
+from sqlalchemy.orm import Session, selectinload, joinedload, lazyload, raiseload
+from sqlalchemy.orm.attributes import set_committed_value
+from sqlalchemy.exc import IntegrityError
+from fastauth.exceptions import UserAlreadyExists
+from fastauth.contrib.sqlalchemy.loaders import SQLAlchemyUserLoader
+from fastauth.storage.roles import RolePermissionCache
+
+_HAS_WRITES = "fastauth_has_writes"
+_UNIQUE_VIOLATION_SQLSTATE = "23505"
+
+
+def _is_unique_violation(error: IntegrityError, table_name: str) -> bool:
+    """
+    Check if integrity error is unique constraint violation on `table_name`,
+    other failures (foreign key, not null, check) are not duplicates.
+    """
+    orig = error.orig
+    sqlstate = getattr(orig, "sqlstate", None) or getattr(orig, "pgcode", None)
+    if sqlstate is not None:
+        if sqlstate != _UNIQUE_VIOLATION_SQLSTATE:
+            return False
+        # psycopg keeps table in diagnostics, asyncpg on exception itself
+        diag = getattr(orig, "diag", None)
+        table = getattr(diag, "table_name", None) or getattr(orig, "table_name", None)
+        return table is None or table == table_name
+    message = str(orig)
+    # SQLite: "UNIQUE constraint failed: users.email"
+    if message.startswith("UNIQUE constraint failed"):
+        return f" {table_name}." in message
+    # MySQL: "Duplicate entry 'x' for key 'users.email'"
+    return "Duplicate entry" in message
+
+
+def _track_writes(session: Session) -> None:
+    """
+    Keep flag of uncommitted writes (flushes and ORM bulk statements)
+    in `session.info`, cleared on commit and rollback.
+    """
+    if _HAS_WRITES in session.info:
+        return
+    session.info[_HAS_WRITES] = False
+
+    def mark(*args) -> None:
+        session.info[_HAS_WRITES] = True
+
+    def clear(*args) -> None:
+        session.info[_HAS_WRITES] = False
+
+    def on_execute(state) -> None:
+        if state.is_insert or state.is_update or state.is_delete:
+            mark()
+
+    event.listen(session, "after_flush", mark)
+    event.listen(session, "do_orm_execute", on_execute)
+    event.listen(session, "after_commit", clear)
+    event.listen(session, "after_rollback", clear)
 
 
 class SQLAlchemyBaseRepository(Generic[M, ID], IBaseRepository[M, ID]):
+    """
+    :param session: Async session
+    :param auto_commit: Commit and refresh instance after every write. If disabled,
+        writes are only flushed, instances are not reloaded and caller must call `commit`.
+        Use it with `expire_on_commit=False` sessions.
+    """
+
+    def __init__(self, session: AsyncSession, auto_commit: bool = True):
+        self.session = session
+        self.auto_commit = auto_commit
+
     async def get_by_pk(self, pk: ID, **kwargs) -> M | None:
-        return await self.session.get(self.model, pk)
+        load = kwargs.get("load")
+        # Instance already in session may have required relationships unloaded,
+        # AUTHENTICATE needs only columns, so it can reuse it
+        return await self.session.get(
+            self.model,
+            pk,
+            options=self.get_load_options(load),
+            populate_existing=load not in (None, LoadStrategy.AUTHENTICATE),
+        )
 
     async def get_by_field(self, field: str, value: Any, **kwargs) -> M | None:
         qs = select(self.model).filter_by(**{field: value}).limit(1)
@@ -20,42 +105,334 @@ class SQLAlchemyBaseRepository(Generic[M, ID], IBaseRepository[M, ID]):
     async def create(self, payload: dict[str, Any], **kwargs) -> M:
         instance = self.model(**payload)
         self.session.add(instance)
-        await self.session.commit()
-        await self.session.refresh(instance)
+        await self._save(instance)
         return instance
 
     async def update(self, instance: M, payload: dict[str, Any], **kwargs) -> M:
+        if not self.auto_commit and self._can_update_returning(payload):
+            return await self._update_returning(instance, payload)
+
+        if inspect(instance).detached:
+            # e.g. loaded in another session
+            instance = await self.session.merge(instance, load=False)
         for key, val in payload.items():
             setattr(instance, key, val)
         self.session.add(instance)
-        await self.session.commit()
-        await self.session.refresh(instance)
+        await self._save(instance)
         return instance
 
     async def delete(self, instance: M, **kwargs) -> M:
-        await self.session.delete(self.model)
-        await self.session.commit()
+        await self.session.delete(instance)
+        if self.auto_commit:
+            await self.session.commit()
+        else:
+            await self.session.flush()
         return instance
 
-    async def get_many(self, **kwargs) -> list[M]:
-        pass
+    async def get_many(
+        self,
+        limit: int | None = None,
+        after: Any = None,
+        order_by: str | None = None,
+        **kwargs,
+    ) -> list[M]:
+        load = kwargs.pop("load", None)
+        qs = self._select_many(after, order_by, kwargs).options(
+            *self.get_load_options(load)
+        )
+        if limit is not None:
+            qs = qs.limit(limit)
+        result = await self.session.scalars(qs)
+        return list(result.unique().all())
 
-    def __init__(self, session: AsyncSession):
-        self.session = session
+    async def stream_many(
+        self, chunk_size: int = 1000, order_by: str | None = None, **kwargs
+    ) -> AsyncIterator[M]:
+        """
+        Iterate over all instances through server-side cursor, fetching `chunk_size`
+        rows at once. Relationships are not loaded unless `load` is provided,
+        `LoadStrategy.FULL` can't be used, joined collections can't be chunked.
+        """
+        load = kwargs.pop("load", LoadStrategy.AUTHENTICATE)
+        qs = (
+            self._select_many(None, order_by, kwargs)
+            .options(*self.get_load_options(load))
+            .execution_options(yield_per=chunk_size)
+        )
+        result = await self.session.stream_scalars(qs)
+        try:
+            async for instance in result:
+                yield instance
+        finally:
+            await result.close()
+
+    def get_cursor(self, instance: M, order_by: str | None = None) -> Any:
+        mapper = inspect(self.model)
+        pk = mapper.primary_key_from_instance(instance)[0]
+        if order_by is None:
+            return pk
+        return getattr(instance, order_by), pk
+
+    def _select_many(self, after: Any, order_by: str | None, filters: dict[str, Any]):
+        pk_column = inspect(self.model).primary_key[0]
+        qs = select(self.model).filter_by(**filters)
+        if order_by is None:
+            qs = qs.order_by(pk_column)
+            if after is not None:
+                qs = qs.where(pk_column > after)
+        else:
+            # Primary key makes order unique, so rows with equal values aren't skipped
+            column = getattr(self.model, order_by)
+            qs = qs.order_by(column, pk_column)
+            if after is not None:
+                qs = qs.where(tuple_(column, pk_column) > tuple_(*after))
+        return qs
+
+    async def commit(self) -> None:
+        if not self.auto_commit:
+            await self.session.commit()
+
+    def get_load_options(self, load: LoadStrategy | None) -> list[Any]:
+        """
+        Map load strategy to loader options, relationships configured on model
+        are used if strategy is not provided.
+        """
+        if load is None:
+            return []
+        if load == LoadStrategy.AUTHENTICATE:
+            return [raiseload("*")]
+        if load == LoadStrategy.FULL:
+            return [joinedload("*")]
+
+        relationships = inspect(self.model).relationships
+        if load == LoadStrategy.CURRENT_USER:
+            if "oauth_accounts" in relationships:
+                return [lazyload(self.model.oauth_accounts)]
+            return []
+        if "roles" not in relationships:
+            return [raiseload("*")]
+        option = selectinload(self.model.roles)
+        role_mapper = relationships["roles"].mapper
+        if load == LoadStrategy.TOKENS and "permissions" in role_mapper.relationships:
+            option = option.selectinload(role_mapper.class_.permissions)
+        else:
+            option = option.raiseload("*")
+        return [option, raiseload("*")]
+
+    async def _save(self, instance: M) -> None:
+        if self.auto_commit:
+            await self.session.commit()
+            await self.session.refresh(instance)
+        else:
+            await self.session.flush()
+
+    def _can_update_returning(self, payload: dict[str, Any]) -> bool:
+        column_attrs = inspect(self.model).column_attrs
+        return (
+            len(payload) > 0
+            and all(key in column_attrs for key in payload)
+            and self.session.get_bind().dialect.update_returning
+        )
+
+    async def _update_returning(self, instance: M, payload: dict[str, Any]) -> M:
+        """
+        Update columns by single `UPDATE ... RETURNING` statement, without loading
+        instance into session and without reloading its relationships.
+        """
+        mapper = inspect(self.model)
+        pk = mapper.primary_key_from_instance(instance)
+        qs = (
+            update(self.model)
+            .where(*[column == value for column, value in zip(mapper.primary_key, pk)])
+            .values(payload)
+            .returning(*[getattr(self.model, key) for key in payload])
+            .execution_options(synchronize_session=False)
+        )
+        row = (await self.session.execute(qs)).one()
+        for key, value in zip(payload, row):
+            set_committed_value(instance, key, value)
+        return instance
 
 
 class SQLAlchemyUserRepository(
     Generic[UM, ID], IUserRepository[UM, ID], SQLAlchemyBaseRepository[UM, ID]
 ):
+    def __init__(
+        self,
+        session: AsyncSession,
+        loader: SQLAlchemyUserLoader[UM, ID] | None = None,
+        auto_commit: bool = True,
+    ):
+        super().__init__(session, auto_commit)
+        self.loader = loader
+        if loader is not None:
+            _track_writes(session.sync_session)
+
+    async def get_by_pk(self, pk: ID, **kwargs) -> UM | None:
+        # Loader fetches roles with permissions, enough for anything but FULL
+        if (
+            self.loader is not None
+            and kwargs.keys() <= {"load"}
+            and kwargs.get("load") != LoadStrategy.FULL
+            and not self._has_writes()
+        ):
+            user = await self.loader.load(pk)
+            if user is None:
+                return None
+            # Loaded instance is shared by all callers of the batch,
+            # so every caller gets own copy bound to its session
+            return await self.session.merge(user, load=False)
+        return await super().get_by_pk(pk, **kwargs)
+
+    def _has_writes(self) -> bool:
+        """
+        Loader reads in own session, so it doesn't see uncommitted writes of this one
+        """
+        session = self.session.sync_session
+        return bool(
+            session.info.get(_HAS_WRITES)
+            or session.new
+            or session.dirty
+            or session.deleted
+        )
+
+    async def get_by_any_field(
+        self, values: dict[str, Any], exclude_pk: ID | None = None
+    ) -> UM | None:
+        qs = select(self.model).where(
+            or_(*[getattr(self.model, f) == v for f, v in values.items()])
+        )
+        if exclude_pk is not None:
+            pk_column = inspect(self.model).primary_key[0]
+            qs = qs.where(pk_column != exclude_pk)
+        return await self.session.scalar(qs.limit(1))
+
+    async def create_many(self, payloads: list[dict[str, Any]]) -> list[ID]:
+        if not payloads:
+            return []
+        mapper = inspect(self.model)
+        pk_key = mapper.get_property_by_column(mapper.primary_key[0]).key
+        roles = [payload.get("roles") or [] for payload in payloads]
+        rows = [
+            {key: value for key, value in payload.items() if key != "roles"}
+            for payload in payloads
+        ]
+        try:
+            # ORM bulk INSERT, sent as executemany with RETURNING of new ids
+            result = await self.session.execute(
+                insert(self.model).returning(
+                    getattr(self.model, pk_key), sort_by_parameter_order=True
+                ),
+                rows,
+            )
+            ids = list(result.scalars())
+            role_rows = self._role_rows(ids, roles)
+            if role_rows:
+                secondary = mapper.relationships["roles"].secondary
+                await self.session.execute(insert(secondary), role_rows)
+            if self.auto_commit:
+                await self.session.commit()
+        except IntegrityError as e:
+            await self.session.rollback()
+            if _is_unique_violation(e, inspect(self.model).local_table.name):
+                raise UserAlreadyExists(e)
+            raise
+        return ids
+
+    def _role_rows(self, ids: list[ID], roles: list[list[Any]]) -> list[dict[str, Any]]:
+        if not any(roles):
+            return []
+        relationship = inspect(self.model).relationships["roles"]
+        (_, user_column), *_ = relationship.synchronize_pairs
+        (role_pk, role_column), *_ = relationship.secondary_synchronize_pairs
+        role_pk_key = relationship.mapper.get_property_by_column(role_pk).key
+        return [
+            {user_column.key: user_id, role_column.key: getattr(role, role_pk_key)}
+            for user_id, user_roles in zip(ids, roles)
+            for role in user_roles
+        ]
+
+    async def increment_token_version(self, pk: ID) -> int | None:
+        mapper = inspect(self.model)
+        token_version = self.model.token_version
+        qs = (
+            update(self.model)
+            .where(mapper.primary_key[0] == pk)
+            .values(token_version=func.coalesce(token_version, 0) + 1)
+            .execution_options(synchronize_session=False)
+        )
+        if self.session.get_bind().dialect.update_returning:
+            version = await self.session.scalar(qs.returning(token_version))
+        else:
+            await self.session.execute(qs)
+            version = await self.session.scalar(
+                select(token_version).where(mapper.primary_key[0] == pk)
+            )
+        # Keep instance already loaded into session in sync, without expiring it
+        instance = self.session.identity_map.get(
+            mapper.identity_key_from_primary_key((pk,))
+        )
+        if instance is not None and version is not None:
+            set_committed_value(instance, "token_version", version)
+        if self.auto_commit:
+            await self.session.commit()
+        return version
+
+    async def update_hashed_passwords(self, hashes: dict[ID, tuple[str, str]]) -> None:
+        if not hashes:
+            return
+        mapper = inspect(self.model)
+        hashed_password = mapper.columns["hashed_password"]
+        # Compare-and-set by primary key and old hash, sent as single executemany
+        stmt = (
+            update(mapper.local_table)
+            .where(
+                mapper.primary_key[0] == bindparam("b_id"),
+                hashed_password == bindparam("b_old_hash"),
+            )
+            .values({hashed_password.key: bindparam("b_new_hash")})
+        )
+        await self.session.execute(
+            stmt,
+            [
+                {"b_id": user_id, "b_old_hash": old_hash, "b_new_hash": new_hash}
+                for user_id, (old_hash, new_hash) in hashes.items()
+            ],
+        )
+        if self.auto_commit:
+            await self.session.commit()
+
+    async def create(self, payload: dict[str, Any], **kwargs) -> UM:
+        try:
+            return await super().create(payload, **kwargs)
+        except IntegrityError as e:
+            await self.session.rollback()
+            if _is_unique_violation(e, inspect(self.model).local_table.name):
+                raise UserAlreadyExists(e)
+            raise
+
+    async def update(self, instance: UM, payload: dict[str, Any], **kwargs) -> UM:
+        try:
+            return await super().update(instance, payload, **kwargs)
+        except IntegrityError as e:
+            await self.session.rollback()
+            if _is_unique_violation(e, inspect(self.model).local_table.name):
+                raise UserAlreadyExists(e)
+            raise
+
     async def get_by_login_fields(
-        self, login_fields: list[str], value: Any
+        self, login_fields: list[str], value: Any, **kwargs
     ) -> UM | None:
         qs = (
             select(self.model)
             .where(or_(*[getattr(self.model, f) == value for f in login_fields]))
             .limit(1)
         )
-        return await self.session.scalar(qs)
+        options = self.get_load_options(kwargs.get("load"))
+        if options:
+            qs = qs.options(*options).execution_options(populate_existing=True)
+        result = await self.session.execute(qs)
+        return result.unique().scalar_one_or_none()
 
 
 class SQLAlchemyOAuthRepository(
@@ -98,6 +475,55 @@ class SQLAlchemyOAuthRepository(
 class SQLAlchemyRoleRepository(
     Generic[RM, ID], IRoleRepository[RM, ID], SQLAlchemyBaseRepository[RM, ID]
 ):
+    def __init__(
+        self,
+        session: AsyncSession,
+        permission_cache: RolePermissionCache | None = None,
+        auto_commit: bool = True,
+    ):
+        """
+        :param permission_cache: Cache invalidated after roles are changed
+        """
+        super().__init__(session, auto_commit)
+        self.permission_cache = permission_cache
+        self._changed_roles: set[str] = set()
+
+    def get_load_options(self, load: LoadStrategy | None) -> list[Any]:
+        if load is None and "permissions" in inspect(self.model).relationships:
+            return [selectinload(self.model.permissions)]
+        return super().get_load_options(load)
+
+    async def create(self, payload: dict[str, Any], **kwargs) -> RM:
+        instance = await super().create(payload, **kwargs)
+        self._on_roles_changed(instance.name)
+        return instance
+
+    async def update(self, instance: RM, payload: dict[str, Any], **kwargs) -> RM:
+        name = instance.name
+        instance = await super().update(instance, payload, **kwargs)
+        self._on_roles_changed(name, instance.name)
+        return instance
+
+    async def delete(self, instance: RM, **kwargs) -> RM:
+        instance = await super().delete(instance, **kwargs)
+        self._on_roles_changed(instance.name)
+        return instance
+
+    async def commit(self) -> None:
+        await super().commit()
+        if self._changed_roles:
+            roles, self._changed_roles = self._changed_roles, set()
+            self.permission_cache.invalidate(*roles)
+
+    def _on_roles_changed(self, *roles: str) -> None:
+        if self.permission_cache is None:
+            return
+        if self.auto_commit:
+            self.permission_cache.invalidate(*roles)
+        else:
+            # Invalidate after commit, so cache isn't filled with uncommitted state
+            self._changed_roles.update(roles)
+
     async def get_roles_by_list(self, roles: list[str]) -> list[RM]:
         qs = select(self.model).where(self.model.name.in_(roles))
         result = await self.session.scalars(qs)
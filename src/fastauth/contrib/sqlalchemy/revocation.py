@@ -0,0 +1,53 @@
+import time
+
+from sqlalchemy import select, delete, or_
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from fastauth.contrib.sqlalchemy.models import BaseRevokedTokenModel
+from fastauth.storage.revocation import BaseRevocationBackend
+
+
+class SQLAlchemyRevocationBackend(BaseRevocationBackend):
+    """
+    Revocation backend stored in `revoked_tokens` table. Works with own sessions,
+    because `RevocationList` outlives request sessions.
+    """
+
+    model: type[BaseRevokedTokenModel]
+
+    def __init__(self, session_factory: async_sessionmaker[AsyncSession]):
+        self.session_factory = session_factory
+
+    async def revoke(self, jti: str, expires_at: float | None = None) -> None:
+        async with self.session_factory() as session:
+            await session.merge(
+                self.model(jti=jti, expires_at=expires_at, revoked_at=time.time())
+            )
+            await session.commit()
+
+    async def is_revoked(self, jti: str) -> bool:
+        qs = select(self.model.jti).where(
+            self.model.jti == jti, self._not_expired(time.time())
+        )
+        async with self.session_factory() as session:
+            return await session.scalar(qs) is not None
+
+    async def get_revoked(self, since: float | None = None) -> dict[str, float | None]:
+        qs = select(self.model.jti, self.model.expires_at).where(
+            self._not_expired(time.time())
+        )
+        if since is not None:
+            qs = qs.where(self.model.revoked_at >= since)
+        async with self.session_factory() as session:
+            result = await session.execute(qs)
+            return {jti: expires_at for jti, expires_at in result.all()}
+
+    async def purge_expired(self) -> None:
+        async with self.session_factory() as session:
+            await session.execute(
+                delete(self.model).where(self.model.expires_at <= time.time())
+            )
+            await session.commit()
+
+    def _not_expired(self, now: float):
+        return or_(self.model.expires_at.is_(None), self.model.expires_at > now)
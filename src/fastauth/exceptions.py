@@ -30,6 +30,16 @@ class FastAuthException(Exception):
         )
 
 
+class UserAlreadyExists(FastAuthException):
+    def __init__(self, debug: Exception | None = None):
+        super().__init__(
+            status.HTTP_400_BAD_REQUEST,
+            "User already exists.",
+            "User with provided credentials already exists.",
+            debug,
+        )
+
+
 def set_exception_handler(app: FastAPI, debug: bool = False):
     @app.exception_handler(FastAuthException)
     async def set_exception_handler(
@@ -40,4 +50,4 @@ def set_exception_handler(app: FastAPI, debug: bool = False):
     return app
 
 
-__all__ = ["FastAuthException", "status", "set_exception_handler"]
+__all__ = ["FastAuthException", "UserAlreadyExists", "status", "set_exception_handler"]
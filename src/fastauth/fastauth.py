@@ -1,4 +1,6 @@
-from typing import Generic
+import functools
+from typing import Callable, Generic
+from fastapi import Request
 from fastapi.params import Depends
 from fastauth.models import UM
 from fastauth.types import ID
@@ -10,6 +12,27 @@ from fastauth.services.auth import BaseAuthService
 from fastauth.transport.base import BaseTransport
 
 
+def _memoize_dependency(func):
+    """
+    Return the same dependency callable for the same arguments, so FastAPI can
+    resolve it only once per request, even when it used by several dependencies.
+    """
+
+    @functools.wraps(func)
+    def wrapper(self: "FastAuth", *args, **kwargs):
+        key = (
+            func.__name__,
+            *(tuple(a) if isinstance(a, list) else a for a in args),
+            *sorted(kwargs.items()),
+        )
+        dependency = self._dependencies.get(key)
+        if dependency is None:
+            dependency = self._dependencies[key] = func(self, *args, **kwargs)
+        return dependency
+
+    return wrapper
+
+
 class FastAuth(Generic[UM, ID]):
     def __init__(
         self,
@@ -20,6 +43,7 @@ class FastAuth(Generic[UM, ID]):
         self.settings = settings
         self.service_dep = service_dep
         self.transport = transport
+        self._dependencies: dict[tuple, Callable] = {}
 
     def get_access_token(self):
         return self.__get_token(TokenType.ACCESS)
@@ -27,52 +51,62 @@ class FastAuth(Generic[UM, ID]):
     def get_refresh_token(self):
         return self.__get_token(TokenType.REFRESH)
 
+    @_memoize_dependency
     def get_current_user(self):
         async def _get_current_user(
+            request: Request,
             token_payload: TokenData = Depends(self.get_access_token()),
             service: BaseAuthService = Depends(self.service_dep),
         ):
-            return await service.authenticate(token_payload)
+            return await self._authenticate(request, service, token_payload)
 
         return _get_current_user
 
-    def require_permission(self, permission: str):
+    @_memoize_dependency
+    def require_permission(self, permission: str, stateless: bool | None = None):
         async def _require_permission(
+            request: Request,
             token_payload: TokenData = Depends(self.get_access_token()),
             service: BaseAuthService = Depends(self.service_dep),
         ):
-            if not service.has_permission(token_payload.permissions, permission):
+            if not service.has_permission(token_payload.permission_index, permission):
                 raise FastAuthException(
                     status.HTTP_403_FORBIDDEN,
                     "Access denied",
                     f"Insufficient permission. Required: {permission}",
                 )
-            return await service.authenticate(token_payload)
+            return await self._authorize(request, service, token_payload, stateless)
 
         return _require_permission
 
-    def require_role(self, role: str):
+    @_memoize_dependency
+    def require_role(self, role: str, stateless: bool | None = None):
         async def _require_permission(
+            request: Request,
             token_payload: TokenData = Depends(self.get_access_token()),
             service: BaseAuthService = Depends(self.service_dep),
         ):
-            if not service.has_role(token_payload.roles, role):
+            if not service.has_role(token_payload.permission_index.roles, role):
                 raise FastAuthException(
                     status.HTTP_403_FORBIDDEN,
                     "Access denied",
                     f"Insufficient role. Required: {role}",
                 )
-            return await service.authenticate(token_payload)
+            return await self._authorize(request, service, token_payload, stateless)
 
         return _require_permission
 
-    def require_any_permission(self, permissions: list[str]):
+    @_memoize_dependency
+    def require_any_permission(
+        self, permissions: list[str], stateless: bool | None = None
+    ):
         async def _require_permission(
+            request: Request,
             token_payload: TokenData = Depends(self.get_access_token()),
             service: BaseAuthService = Depends(self.service_dep),
         ):
             if not any(
-                service.has_permission(token_payload.permissions, perm)
+                service.has_permission(token_payload.permission_index, perm)
                 for perm in permissions
             ):
                 raise FastAuthException(
@@ -80,17 +114,21 @@ class FastAuth(Generic[UM, ID]):
                     "Access denied",
                     f"Insufficient permissions. Required: {','.join(permissions)}",
                 )
-            return await service.authenticate(token_payload)
+            return await self._authorize(request, service, token_payload, stateless)
 
         return _require_permission
 
-    def require_all_permissions(self, permissions: list[str]):
+    @_memoize_dependency
+    def require_all_permissions(
+        self, permissions: list[str], stateless: bool | None = None
+    ):
         async def _require_all_permission(
+            request: Request,
             token_payload: TokenData = Depends(self.get_access_token()),
             service: BaseAuthService = Depends(self.service_dep),
         ):
             if not all(
-                service.has_permission(token_payload.permissions, perm)
+                service.has_permission(token_payload.permission_index, perm)
                 for perm in permissions
             ):
                 raise FastAuthException(
@@ -98,19 +136,52 @@ class FastAuth(Generic[UM, ID]):
                     "Access denied",
                     f"Insufficient permissions. Required: {','.join(permissions)}",
                 )
-            return await service.authenticate(token_payload)
+            return await self._authorize(request, service, token_payload, stateless)
 
         return _require_all_permission
 
+    @_memoize_dependency
     def __get_token(self, token_type: TokenType):
+        state_key = f"fastauth_{token_type}_token"
+
         async def _check_token_internal(
+            request: Request,
             token: str = Depends(self.transport.get_schema()),
             service: BaseAuthService = Depends(self.service_dep),
         ):
-            return await service.verify_token(token, token_type)
+            token_payload = getattr(request.state, state_key, None)
+            if token_payload is None:
+                token_payload = await service.verify_token(token, token_type)
+                setattr(request.state, state_key, token_payload)
+            return token_payload
 
         return _check_token_internal
 
+    async def _authorize(
+        self,
+        request: Request,
+        service: BaseAuthService,
+        token_payload: TokenData,
+        stateless: bool | None = None,
+    ):
+        if stateless is None:
+            stateless = self.settings.STATELESS_AUTHORIZATION
+        if stateless:
+            principal = service.get_principal(token_payload)
+            if principal is not None:
+                return principal
+        return await self._authenticate(request, service, token_payload)
+
+    @staticmethod
+    async def _authenticate(
+        request: Request, service: BaseAuthService, token_payload: TokenData
+    ):
+        user = getattr(request.state, "fastauth_user", None)
+        if user is None:
+            user = await service.authenticate(token_payload)
+            request.state.fastauth_user = user
+        return user
+
     def get_login_response(self, tokens: TokenResponse):
         return self.transport.login_response(tokens)
 
@@ -1,10 +1,14 @@
+from .base import LoadStrategy
 from .roles import IRoleRepository, IPermissionRepository
 from .users import IUserRepository
 from .oauths import IOAuthRepository
+from .singleflight import SingleFlightUserMixin
 
 __all__ = [
+    "LoadStrategy",
     "IRoleRepository",
     "IPermissionRepository",
     "IUserRepository",
     "IOAuthRepository",
+    "SingleFlightUserMixin",
 ]
@@ -1,7 +1,27 @@
 from fastauth.models import M
 from fastauth.types import ID
-from typing import Generic, Any
+from typing import AsyncIterator, Generic, Any
 from abc import ABC, abstractmethod
+from enum import StrEnum
+
+
+class LoadStrategy(StrEnum):
+    """
+    Which relationships operation needs, passed to repository as `load` keyword.
+    Repositories map it to the cheapest way to load them.
+    """
+
+    # Only own columns, e.g. to check token version or reset password
+    AUTHENTICATE = "authenticate"
+    # User returned by authentication, relationships configured on model
+    # (e.g. roles) without OAuth accounts
+    CURRENT_USER = "current_user"
+    # Roles without their permissions, e.g. to mint token with cached permissions
+    ROLES = "roles"
+    # Roles with permissions, to mint access token
+    TOKENS = "tokens"
+    # All relationships, e.g. for admin views
+    FULL = "full"
 
 
 class IBaseRepository(Generic[M, ID], ABC):
@@ -28,5 +48,56 @@ class IBaseRepository(Generic[M, ID], ABC):
         raise NotImplementedError
 
     @abstractmethod
-    async def get_many(self, **kwargs) -> list[M]:
+    async def get_many(
+        self,
+        limit: int | None = None,
+        after: Any = None,
+        order_by: str | None = None,
+        **kwargs,
+    ) -> list[M]:
+        """
+        Get page of instances ordered by `order_by` field and primary key
+        (keyset pagination).
+
+        :param limit: Page size
+        :param after: Cursor of last instance of previous page, see `get_cursor`
+        :param order_by: Field to order by, primary key if not provided
+        :param kwargs: Filters by field values
+        """
         raise NotImplementedError
+
+    async def stream_many(
+        self, chunk_size: int = 1000, order_by: str | None = None, **kwargs
+    ) -> AsyncIterator[M]:
+        """
+        Iterate over all instances, loading at most `chunk_size` of them at once.
+        Default implementation requests pages by `get_many`.
+
+        :param chunk_size: Number of instances loaded at once
+        :param order_by: Field to order by, primary key if not provided
+        :param kwargs: Filters by field values
+        """
+        after = None
+        while True:
+            page = await self.get_many(
+                limit=chunk_size, after=after, order_by=order_by, **kwargs
+            )
+            for instance in page:
+                yield instance
+            if len(page) < chunk_size:
+                return
+            after = self.get_cursor(page[-1], order_by)
+
+    def get_cursor(self, instance: M, order_by: str | None = None) -> Any:
+        """
+        Cursor of instance for `after` argument of `get_many`: its primary key,
+        or tuple of `order_by` value and primary key.
+        """
+        if order_by is None:
+            return instance.id
+        return getattr(instance, order_by), instance.id
+
+    async def commit(self) -> None:
+        """
+        Commit pending writes, if repository doesn't commit on every write
+        """
@@ -0,0 +1,60 @@
+from typing import Any, Hashable
+
+from fastauth.storage.users import make_snapshot
+from fastauth.utils.singleflight import SingleFlight
+
+
+class SingleFlightUserMixin:
+    """
+    Mixin for `IUserRepository` implementations, which coalesces concurrent
+    `get_by_pk` and `get_by_login_fields` lookups of the same user into one query.
+
+    `single_flight` should be shared between repository instances, e.g. set as class
+    attribute. Instance returned by the query belongs to session of the request that
+    made it, so other requests receive detached snapshot of it.
+    """
+
+    single_flight: SingleFlight
+
+    async def get_by_pk(self, pk: Any, **kwargs):
+        key = self._single_flight_key("get_by_pk", pk, kwargs)
+        if key is None:
+            return await super().get_by_pk(pk, **kwargs)
+        return await self._coalesce(
+            key, lambda: super(SingleFlightUserMixin, self).get_by_pk(pk, **kwargs)
+        )
+
+    async def get_by_login_fields(self, login_fields: list[str], value: Any, **kwargs):
+        key = self._single_flight_key(
+            "get_by_login_fields", (tuple(login_fields), value), kwargs
+        )
+        if key is None:
+            return await super().get_by_login_fields(login_fields, value, **kwargs)
+        return await self._coalesce(
+            key,
+            lambda: super(SingleFlightUserMixin, self).get_by_login_fields(
+                login_fields, value, **kwargs
+            ),
+        )
+
+    async def _coalesce(self, key: Hashable, func):
+        called = False
+
+        async def call():
+            nonlocal called
+            called = True
+            return await func()
+
+        user = await self.single_flight.do(key, call)
+        if called or user is None:
+            return user
+        return make_snapshot(user)
+
+    @staticmethod
+    def _single_flight_key(method: str, args: Any, kwargs: dict) -> Hashable | None:
+        key = (method, args, tuple(sorted(kwargs.items())))
+        try:
+            hash(key)
+        except TypeError:
+            return None
+        return key
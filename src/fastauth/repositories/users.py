@@ -10,6 +10,66 @@ class IUserRepository(Generic[UM, ID], IBaseRepository[UM, ID], ABC):
 
     @abstractmethod
     async def get_by_login_fields(
-        self, login_fields: list[str], value: Any
+        self, login_fields: list[str], value: Any, **kwargs
     ) -> UM | None:
         raise NotImplementedError
+
+    async def create_many(self, payloads: list[dict[str, Any]]) -> list[ID]:
+        """
+        Create many users at once.
+        Override it to insert all users by one batched query.
+
+        :param payloads: User fields, `roles` contains role instances
+        :return: Primary keys of created users, in order of payloads
+        """
+        ids = []
+        for payload in payloads:
+            user = await self.create(payload)
+            ids.append(user.id)
+        return ids
+
+    async def increment_token_version(self, pk: ID) -> int | None:
+        """
+        Increment `token_version` of user and return new value.
+        Default implementation reloads user before write, override it
+        to increment in DB by one atomic statement.
+
+        :param pk: User primary key
+        :return: New token version, None if user doesn't exist
+        """
+        user = await self.get_by_pk(pk)
+        if user is None:
+            return None
+        token_version = (getattr(user, "token_version", None) or 0) + 1
+        user = await self.update(user, {"token_version": token_version})
+        return user.token_version
+
+    async def update_hashed_passwords(self, hashes: dict[ID, tuple[str, str]]) -> None:
+        """
+        Store new password hashes of many users.
+        Hash is replaced only if user still has old one, so password changed
+        in meantime is kept. Override it to update all users by one query.
+
+        :param hashes: Mapping of user id to pair of old and new password hash
+        """
+        for user_id, (old_hash, new_hash) in hashes.items():
+            user = await self.get_by_pk(user_id)
+            if user is not None and user.hashed_password == old_hash:
+                await self.update(user, {"hashed_password": new_hash})
+        await self.commit()
+
+    async def get_by_any_field(
+        self, values: dict[str, Any], exclude_pk: ID | None = None
+    ) -> UM | None:
+        """
+        Get user which matches any of provided field values.
+        Override it to check all fields by one query.
+
+        :param values: Mapping of field name to value
+        :param exclude_pk: Ignore user with this primary key
+        """
+        for field, value in values.items():
+            user = await self.get_by_field(field, value)
+            if user is not None and (exclude_pk is None or user.id != exclude_pk):
+                return user
+        return None
@@ -1,4 +1,5 @@
 from .auth import get_auth_router
+from .jwks import get_jwks_router
 from .oauth import get_oauth_router
 from .password_reset import get_reset_password_router
 from .signup import get_signup_router
@@ -8,6 +9,7 @@ from .verification import get_verification_router
 
 __all__ = [
     "get_auth_router",
+    "get_jwks_router",
     "get_oauth_router",
     "get_reset_password_router",
     "get_signup_router",
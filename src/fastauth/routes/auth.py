@@ -27,8 +27,21 @@ def get_auth_router(security: FastAuth, **kwargs):
         tokens = await service.login(credentials.username, credentials.password)
         return security.get_login_response(tokens)
 
-    @router.post("/logout", dependencies=[Depends(security.get_current_user())])
-    async def user_logout():
+    @router.post("/logout")
+    async def user_logout(
+        token: TokenData = Depends(security.get_access_token()),
+        user=Depends(security.get_current_user()),
+        service: BaseAuthService = Depends(security.service_dep),
+    ):
+        await service.logout(user, token)
+        return security.get_logout_response()
+
+    @router.post("/logout-all")
+    async def user_logout_all(
+        user=Depends(security.get_current_user()),
+        service: BaseAuthService = Depends(security.service_dep),
+    ):
+        await service.logout_all(user)
         return security.get_logout_response()
 
     if security.settings.USE_REFRESH_TOKEN:
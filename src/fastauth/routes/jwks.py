@@ -0,0 +1,35 @@
+from fastapi import Request, Response
+
+from fastauth.fastauth import FastAuth
+from fastauth.utils.keyring import KeyRing
+from fastauth.utils.router import default_router
+
+
+def _etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """
+    Check `If-None-Match` header: `*` or comma-separated list of entity tags,
+    compared weakly (`W/` prefix is ignored)
+    """
+    if not if_none_match:
+        return False
+    for tag in if_none_match.split(","):
+        tag = tag.strip()
+        if tag == "*" or tag.removeprefix("W/") == etag:
+            return True
+    return False
+
+
+def get_jwks_router(security: FastAuth, keyring: KeyRing, **kwargs):
+    router = default_router("", ["Auth"], **kwargs)
+
+    @router.get(security.settings.JWKS_URL)
+    async def jwks(request: Request):
+        headers = {
+            "ETag": keyring.etag,
+            "Cache-Control": f"public, max-age={security.settings.JWKS_MAX_AGE_SECONDS}",
+        }
+        if _etag_matches(request.headers.get("if-none-match"), keyring.etag):
+            return Response(status_code=304, headers=headers)
+        return Response(keyring.jwks, media_type="application/json", headers=headers)
+
+    return router
@@ -1,5 +1,7 @@
-from pydantic import BaseModel
+from datetime import datetime, UTC
+from pydantic import BaseModel, PrivateAttr
 from enum import StrEnum
+from fastauth.utils.permissions import PermissionIndex
 
 
 class TokenType(StrEnum):
@@ -15,6 +17,145 @@ class TokenData(BaseModel):
     token_type: TokenType
     expires_in: int | None = None
     jti: str | None = None
+    iat: datetime | None = None
+    exp: datetime | None = None
+    token_version: int | None = None
+    roles_version: int | None = None
+    session_id: str | None = None
+
+    _permission_index: PermissionIndex | None = PrivateAttr(default=None)
+
+    def set_permissions(self, permissions: list[str]) -> None:
+        if permissions is not self.permissions:
+            self.permissions = permissions
+            self._permission_index = None
+
+    @property
+    def permission_index(self) -> PermissionIndex:
+        """
+        Roles and permissions compiled for fast checks, built once per token
+        """
+        if self._permission_index is None:
+            self._permission_index = PermissionIndex(self.permissions, self.roles)
+        return self._permission_index
+
+
+class TokenClaims:
+    """
+    Lightweight read-only counterpart of `TokenData`, built straight from verified
+    JWT claims without pydantic validation. Used on the access token hot path.
+    """
+
+    _fields = (
+        "user_id",
+        "email",
+        "roles",
+        "permissions",
+        "token_type",
+        "expires_in",
+        "jti",
+        "iat",
+        "exp",
+        "token_version",
+        "roles_version",
+        "session_id",
+    )
+    __slots__ = (*_fields, "_permission_index")
+
+    def __init__(
+        self,
+        user_id: str,
+        email: str,
+        roles: list[str],
+        permissions: list[str],
+        token_type: TokenType,
+        expires_in: int | None = None,
+        jti: str | None = None,
+        iat: datetime | None = None,
+        exp: datetime | None = None,
+        token_version: int | None = None,
+        roles_version: int | None = None,
+        session_id: str | None = None,
+    ):
+        self.user_id = user_id
+        self.email = email
+        self.roles = roles
+        self.permissions = permissions
+        self.token_type = token_type
+        self.expires_in = expires_in
+        self.jti = jti
+        self.iat = iat
+        self.exp = exp
+        self.token_version = token_version
+        self.roles_version = roles_version
+        self.session_id = session_id
+        self._permission_index: PermissionIndex | None = None
+
+    def set_permissions(self, permissions: list[str]) -> None:
+        if permissions is not self.permissions:
+            self.permissions = permissions
+            self._permission_index = None
+
+    @property
+    def permission_index(self) -> PermissionIndex:
+        """
+        Roles and permissions compiled for fast checks, built once per token
+        """
+        if self._permission_index is None:
+            self._permission_index = PermissionIndex(self.permissions, self.roles)
+        return self._permission_index
+
+    @classmethod
+    def from_claims(cls, claims: dict) -> "TokenClaims":
+        exp = claims.get("exp")
+        iat = claims.get("iat")
+        return cls(
+            user_id=claims["sub"],
+            email=claims["email"],
+            roles=claims.get("roles", []),
+            permissions=claims.get("permissions", []),
+            token_type=TokenType(claims["token_type"]),
+            expires_in=exp - iat if exp and iat else None,
+            jti=claims.get("jti"),
+            iat=datetime.fromtimestamp(iat, UTC) if iat else None,
+            exp=datetime.fromtimestamp(exp, UTC) if exp else None,
+            token_version=claims.get("token_version"),
+            roles_version=claims.get("roles_version"),
+            session_id=claims.get("session_id"),
+        )
+
+    def model_dump(self) -> dict:
+        return dict(self)
+
+    def __iter__(self):
+        for name in self._fields:
+            yield name, getattr(self, name)
+
+    def __repr__(self):
+        return f"TokenClaims(user_id={self.user_id!r}, token_type={self.token_type!r})"
+
+
+class TokenPrincipal:
+    """
+    User built from access token claims only, returned by stateless authorization
+    instead of loading user from DB.
+    """
+
+    __slots__ = ("id", "email", "roles", "permissions", "token")
+
+    def __init__(self, id, token: TokenData | TokenClaims):
+        self.id = id
+        self.email = token.email
+        self.roles = token.roles
+        self.permissions = token.permissions
+        self.token = token
+
+    def __iter__(self):
+        for name in ("id", "email", "roles", "permissions"):
+            yield name, getattr(self, name)
+
+    def __repr__(self):
+        return f"TokenPrincipal(id={self.id!r})"
 
 
 class TokenResponse(BaseModel):
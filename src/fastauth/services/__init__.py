@@ -1,3 +1,11 @@
 from .auth import BaseAuthService, UUIDMixin
+from .migration import PasswordMigrationJob, PasswordMigrationReport
+from .rehash import RehashQueue
 
-__all__ = ["BaseAuthService", "UUIDMixin"]
+__all__ = [
+    "BaseAuthService",
+    "UUIDMixin",
+    "PasswordMigrationJob",
+    "PasswordMigrationReport",
+    "RehashQueue",
+]
@@ -1,20 +1,51 @@
+import asyncio
+import hmac
+import inspect
+import time
 import uuid
 from abc import abstractmethod
+from concurrent.futures import Executor
+from contextlib import nullcontext
+from itertools import islice
 from fastapi import Request
+from fastauth.repositories.base import LoadStrategy
 from fastauth.repositories.oauths import IOAuthRepository
 from fastauth.repositories.roles import IRoleRepository
 from fastauth.repositories.users import IUserRepository
-from fastauth.schemas.auth import TokenType, TokenData, TokenResponse
+from fastauth.schemas.auth import (
+    TokenType,
+    TokenData,
+    TokenResponse,
+    TokenPrincipal,
+)
 from fastauth.schemas.oauth import OAuthCreate
 from fastauth.schemas.users import BaseUserCreate, BaseUserUpdate
+from fastauth.services.rehash import RehashQueue
 from fastauth.settings import FastAuthSettings
 from fastauth.storage.base import BaseTokenStorage
-from typing import Generic
+from fastauth.storage.roles import RolePermissionCache
+from fastauth.storage.users import (
+    BaseUserCache,
+    UserSnapshot,
+    get_token_version_cache,
+)
+from typing import Generic, Any, Iterable
 from fastauth.models import UM, URPM, UOAM
 from fastauth.types import ID
-from fastauth.exceptions import FastAuthException, status
+from fastauth.exceptions import FastAuthException, UserAlreadyExists, status
+from fastauth.utils.cache import TTLCache
 from fastauth.utils.jwt_helper import JWTPayload, to_jwt_token, to_jwt_payload
-from fastauth.utils.password import IPasswordHelper, PasswordHelper
+from fastauth.utils.limiter import get_password_hash_limiter
+from fastauth.utils.permissions import PermissionIndex
+from fastauth.utils.password import (
+    IPasswordHelper,
+    IAsyncPasswordHelper,
+    PasswordHelper,
+    password_fingerprint,
+)
+
+
+_MISSING = object()
 
 
 class BaseAuthService(Generic[UM, ID]):
@@ -25,7 +56,11 @@ class BaseAuthService(Generic[UM, ID]):
         token_storage: BaseTokenStorage,
         role_repo: IRoleRepository | None = None,
         oauth_repo: IOAuthRepository | None = None,
-        password_helper: IPasswordHelper = PasswordHelper(),
+        password_helper: IPasswordHelper | IAsyncPasswordHelper = PasswordHelper(),
+        token_version_cache: TTLCache[str, int | None] | None = None,
+        user_cache: BaseUserCache[ID] | None = None,
+        rehash_queue: RehashQueue[ID] | None = None,
+        role_permission_cache: RolePermissionCache | None = None,
     ):
         self.settings = settings
         self.user_repo = user_repo
@@ -33,6 +68,20 @@ class BaseAuthService(Generic[UM, ID]):
         self.oauth_repo = oauth_repo
         self.token_storage = token_storage
         self.password_helper = password_helper
+        self.password_hash_limiter = get_password_hash_limiter(settings)
+        if self.password_hash_limiter is not None and not inspect.iscoroutinefunction(
+            password_helper.hash
+        ):
+            raise RuntimeError(
+                "To use PASSWORD_HASH_MAX_CONCURRENCY you need to pass AsyncPasswordHelper to password_helper argument of BaseAuthService"
+            )
+        if token_version_cache is None:
+            # Shared by default, otherwise every token_version check queries DB
+            token_version_cache = get_token_version_cache(settings)
+        self.token_version_cache = token_version_cache
+        self.user_cache = user_cache
+        self.rehash_queue = rehash_queue
+        self.role_permission_cache = role_permission_cache
 
     @abstractmethod
     def parse_user_id(self, value: str) -> ID:
@@ -47,13 +96,26 @@ class BaseAuthService(Generic[UM, ID]):
                 f"{token_type} token type required.",
             )
 
-        # jti = payload.jti
-        # if jti and await self.token_storage.is_token_revoked(jti):
-        #     raise FastAuthException(
-        #         status.HTTP_401_UNAUTHORIZED,
-        #         "Invalid token revoked",
-        #         "Token was revoked, please login again later."
-        #     )
+        # Token itself or whole session (access and refresh tokens) may be revoked
+        for token_id in (payload.jti, payload.session_id):
+            if token_id and await self.token_storage.is_token_revoked(token_id):
+                raise FastAuthException(
+                    status.HTTP_401_UNAUTHORIZED,
+                    "Invalid token revoked",
+                    "Token was revoked, please login again later.",
+                )
+
+        if payload.token_version is not None:
+            token_version = await self.get_token_version(payload.user_id)
+            if token_version != payload.token_version:
+                raise FastAuthException(
+                    status.HTTP_401_UNAUTHORIZED,
+                    "Invalid token revoked",
+                    "Token was revoked, please login again later.",
+                )
+
+        if payload.roles_version is not None:
+            payload.set_permissions(await self.get_role_permissions(payload))
 
         # Handle by token_storage
         # if datetime.now(UTC) > payload.exp:
@@ -64,6 +126,33 @@ class BaseAuthService(Generic[UM, ID]):
         #     )
         return payload
 
+    async def get_token_version(self, user_id: str) -> int | None:
+        token_version = self.token_version_cache.get(user_id, _MISSING)
+        if token_version is not _MISSING:
+            return token_version
+
+        user = await self.user_repo.get_by_pk(
+            self.parse_user_id(user_id), load=LoadStrategy.AUTHENTICATE
+        )
+        token_version = getattr(user, "token_version", None)
+        self.token_version_cache.set(user_id, token_version)
+        return token_version
+
+    def _get_role_permission_cache(self) -> RolePermissionCache:
+        if self.role_repo is None or self.role_permission_cache is None:
+            raise RuntimeError(
+                "To use roles permissions format you need to pass IRoleRepository and RolePermissionCache to role_repo and role_permission_cache arguments of BaseAuthService"
+            )
+        return self.role_permission_cache
+
+    async def get_role_permissions(self, payload: TokenData) -> list[str]:
+        """
+        Expand permissions of token which carries only roles
+        """
+        return await self._get_role_permission_cache().get_permissions(
+            payload.roles, self.role_repo, payload.roles_version
+        )
+
     async def verify_user(self, user: UM) -> UM:
         error = FastAuthException(
             status.HTTP_401_UNAUTHORIZED,
@@ -78,27 +167,129 @@ class BaseAuthService(Generic[UM, ID]):
             raise error
         return user
 
+    def get_principal(self, payload: TokenData) -> TokenPrincipal | None:
+        """
+        Return user built from token claims, or None if token is older than
+        `STATELESS_AUTHORIZATION_MAX_AGE_SECONDS` and user should be loaded from DB
+        """
+        max_age = self.settings.STATELESS_AUTHORIZATION_MAX_AGE_SECONDS
+        if max_age is not None and (
+            payload.iat is None or time.time() - payload.iat.timestamp() > max_age
+        ):
+            return None
+        return TokenPrincipal(self.parse_user_id(payload.user_id), payload)
+
+    async def get_user(
+        self, user_id: ID, load: LoadStrategy = LoadStrategy.CURRENT_USER
+    ) -> UM | None:
+        """
+        Get user by id. Users loaded for authentication go through `user_cache`,
+        cached users are detached snapshots, use them for reading only.
+
+        :param load: Relationships required by operation
+        """
+        if load != LoadStrategy.CURRENT_USER:
+            return await self.user_repo.get_by_pk(user_id, load=load)
+
+        if self.user_cache is not None:
+            user = await self.user_cache.get(user_id)
+            if user is not None:
+                return user
+
+        user = await self.user_repo.get_by_pk(user_id, load=load)
+        if user is not None and self.user_cache is not None:
+            await self.user_cache.set(user_id, user)
+        return user
+
+    def get_tokens_load_strategy(self) -> LoadStrategy:
+        """
+        Relationships required to mint access token
+        """
+        if self.role_permission_cache is not None and self.role_repo is not None:
+            return LoadStrategy.ROLES
+        if self.settings.ACCESS_TOKEN_PERMISSIONS_FORMAT == "roles":
+            return LoadStrategy.ROLES
+        return LoadStrategy.TOKENS
+
     async def authenticate(self, payload: TokenData) -> UM:
         user_id = self.parse_user_id(payload.user_id)
-        user = await self.user_repo.get_by_pk(user_id)
+        user = await self.get_user(user_id)
         return await self.verify_user(user)
 
     @staticmethod
-    def has_permission(user_permissions: list[str], required_permission: str) -> bool:
-        return required_permission in user_permissions
+    def has_permission(
+        user_permissions: list[str] | PermissionIndex, required_permission: str
+    ) -> bool:
+        if not isinstance(user_permissions, PermissionIndex):
+            user_permissions = PermissionIndex(user_permissions)
+        return user_permissions.has_permission(required_permission)
 
     @staticmethod
-    def has_role(user_roles: list[str], required_role: str) -> bool:
+    def has_role(user_roles: list[str] | frozenset[str], required_role: str) -> bool:
         return required_role in user_roles
 
-    async def create_access_token(self, user: URPM, expires_in: int | None = None):
+    async def _hash_password(self, password: str) -> str:
+        async with self.password_hash_limiter or nullcontext():
+            hashed_password = self.password_helper.hash(password)
+            if inspect.isawaitable(hashed_password):
+                hashed_password = await hashed_password
+        return hashed_password
+
+    async def _verify_and_update_password(
+        self, plain_password: str, hashed_password: str
+    ) -> tuple[bool, str | None]:
+        async with self.password_hash_limiter or nullcontext():
+            result = self.password_helper.verify_and_update(
+                plain_password, hashed_password
+            )
+            if inspect.isawaitable(result):
+                result = await result
+        return result
+
+    async def _password_fingerprint(self, hashed_password: str) -> str:
+        if self.settings.RESET_TOKEN_FINGERPRINT == "hash":
+            return await self._hash_password(hashed_password)
+        return password_fingerprint(self.settings.SECRET_KEY, hashed_password)
+
+    async def _verify_password_fingerprint(
+        self, hashed_password: str, fingerprint: str | None
+    ) -> bool:
+        if not fingerprint:
+            return False
+        # Password hashes are in PHC/modular crypt format, HMAC digests are plain hex
+        if fingerprint.startswith("$"):
+            valid, _ = await self._verify_and_update_password(
+                hashed_password, fingerprint
+            )
+            return valid
+        return hmac.compare_digest(
+            password_fingerprint(self.settings.SECRET_KEY, hashed_password),
+            fingerprint,
+        )
+
+    async def create_access_token(
+        self, user: URPM, expires_in: int | None = None, session_id: str | None = None
+    ):
         jti = str(uuid.uuid4())
         roles = []
         if hasattr(user, "roles"):
             roles.extend([r.name for r in user.roles])
         permissions = []
-        if hasattr(user, "permissions"):
-            for role in user.roles:
+        roles_version = None
+        if self.settings.ACCESS_TOKEN_PERMISSIONS_FORMAT == "roles":
+            # Permissions are expanded from roles on verify
+            roles_version = self._get_role_permission_cache().version
+        elif (
+            roles
+            and self.role_permission_cache is not None
+            and self.role_repo is not None
+        ):
+            # Don't touch role.permissions, they may be not loaded
+            permissions = await self.role_permission_cache.get_permissions(
+                roles, self.role_repo
+            )
+        else:
+            for role in getattr(user, "roles", []):
                 permissions.extend(
                     [f"{perm.resource}:{perm.action}" for perm in role.permissions]
                 )
@@ -110,13 +301,14 @@ class BaseAuthService(Generic[UM, ID]):
             token_type=TokenType.ACCESS,
             expires_in=expires_in or self.settings.ACCESS_TOKEN_EXPIRE_SECONDS,
             jti=jti,
+            token_version=getattr(user, "token_version", None),
+            roles_version=roles_version,
+            session_id=session_id,
         )
         token = self.token_storage.encode_token(token_data)
-        # ttl = int((expire - datetime.now(UTC)).total_seconds())
-        # await self.token_storage.store_token(jti, token_data, ttl)
         return token
 
-    async def create_refresh_token(self, user: URPM):
+    async def create_refresh_token(self, user: URPM, session_id: str | None = None):
         jti = str(uuid.uuid4())
         token_data = TokenData(
             user_id=str(user.id),
@@ -126,16 +318,24 @@ class BaseAuthService(Generic[UM, ID]):
             token_type=TokenType.REFRESH,
             expires_in=self.settings.REFRESH_TOKEN_EXPIRE_SECONDS,
             jti=jti,
+            token_version=getattr(user, "token_version", None),
+            session_id=session_id,
         )
         token = self.token_storage.encode_token(token_data)
-        # ttl = int((expire - datetime.now(UTC)).total_seconds())
-        # await self.token_storage.store_token(jti, token_data, ttl)
         return token
 
-    async def create_tokens(self, user: URPM) -> TokenResponse:
+    async def create_tokens(
+        self, user: URPM, session_id: str | None = None
+    ) -> TokenResponse:
+        """
+        Create access and refresh tokens of one session, revoked together on logout
+
+        :param session_id: Id of existing session, e.g. on refresh, new one if None
+        """
+        session_id = session_id or str(uuid.uuid4())
         return TokenResponse(
-            access_token=await self.create_access_token(user),
-            refresh_token=await self.create_refresh_token(user)
+            access_token=await self.create_access_token(user, session_id=session_id),
+            refresh_token=await self.create_refresh_token(user, session_id=session_id)
             if self.settings.USE_REFRESH_TOKEN
             else None,
             expires_in=self.settings.ACCESS_TOKEN_EXPIRE_SECONDS,
@@ -143,21 +343,24 @@ class BaseAuthService(Generic[UM, ID]):
 
     async def refresh_access_token(self, token_payload: TokenData, **kwargs):
         user_id = self.parse_user_id(token_payload.user_id)
-        user = await self.user_repo.get_by_pk(user_id)
+        user = await self.get_user(user_id, load=self.get_tokens_load_strategy())
         user = await self.verify_user(user)
-        tokens = await self.create_tokens(user)
+        tokens = await self.create_tokens(user, token_payload.session_id)
         await self.on_after_access_token_refresh(
             user, tokens, kwargs.get("request", None)
         )
+        return tokens
 
     async def login(self, username: str, password: str, **kwargs) -> TokenResponse:
         user = await self.user_repo.get_by_login_fields(
-            self.settings.USER_LOGIN_FIELDS, username
+            self.settings.USER_LOGIN_FIELDS,
+            username,
+            load=self.get_tokens_load_strategy(),
         )
         user = await self.verify_user(user)
 
         # Check user password
-        is_valid_password, new_hash = self.password_helper.verify_and_update(
+        is_valid_password, new_hash = await self._verify_and_update_password(
             password, user.hashed_password
         )
         if not is_valid_password:
@@ -166,27 +369,111 @@ class BaseAuthService(Generic[UM, ID]):
             )
         # Update password hash
         if new_hash:
-            user = await self.user_repo.update(user, {"hashed_password": new_hash})
+            if self.rehash_queue is not None:
+                self.rehash_queue.submit(user.id, user.hashed_password, new_hash)
+            else:
+                user = await self.update_user(user, {"hashed_password": new_hash})
 
         tokens = await self.create_tokens(user)
         await self.on_after_login(user, tokens, kwargs.get("request", None))
         return tokens
 
+    async def update_user(self, user: UM, payload: dict) -> UM:
+        """
+        Update user in repository and drop it from `user_cache`
+        """
+        if isinstance(user, UserSnapshot):
+            user = await self.user_repo.get_by_pk(user.id)
+        user = await self.user_repo.update(user, payload)
+        await self.user_repo.commit()
+        if self.user_cache is not None:
+            await self.user_cache.invalidate(user.id)
+        if self.rehash_queue is not None and "hashed_password" in payload:
+            # Pending upgrade of replaced hash must not overwrite new password
+            self.rehash_queue.discard(user.id)
+        return user
+
+    async def delete_user(self, user: UM) -> UM:
+        """
+        Delete user from repository and drop it from `user_cache`
+        """
+        if isinstance(user, UserSnapshot):
+            user = await self.user_repo.get_by_pk(user.id)
+        user_id = user.id
+        user = await self.user_repo.delete(user)
+        await self.user_repo.commit()
+        if self.user_cache is not None:
+            await self.user_cache.invalidate(user_id)
+        return user
+
+    async def logout(self, user: UM, token_payload: TokenData, **kwargs) -> None:
+        """
+        Revoke access token and its session, so refresh token of the session
+        can't be used to get new access token
+        """
+        if token_payload.jti:
+            if token_payload.exp is not None:
+                expires_at = token_payload.exp.timestamp()
+            else:
+                expires_at = time.time() + self.settings.ACCESS_TOKEN_EXPIRE_SECONDS
+            await self.token_storage.revoke_token(token_payload.jti, expires_at)
+        if token_payload.session_id:
+            # Refresh tokens of the session are issued before logout,
+            # so they expire before this entry
+            expires_at = time.time() + self.settings.REFRESH_TOKEN_EXPIRE_SECONDS
+            await self.token_storage.revoke_token(token_payload.session_id, expires_at)
+        await self.on_after_logout(user, kwargs.get("request", None))
+
+    async def logout_all(self, user: UM, **kwargs) -> UM:
+        """
+        Invalidate all access and refresh tokens of user, by bumping `token_version`
+        """
+        await self._increment_token_version(user)
+        await self.on_after_logout(user, kwargs.get("request", None))
+        return user
+
+    async def _increment_token_version(self, user: UM) -> int | None:
+        # Incremented in DB, passed user may be outdated snapshot from user_cache
+        user_id = user.id
+        token_version = await self.user_repo.increment_token_version(user_id)
+        await self.user_repo.commit()
+        if self.user_cache is not None:
+            await self.user_cache.invalidate(user_id)
+        self.token_version_cache.set(str(user_id), token_version)
+        return token_version
+
+    async def check_user_exists(
+        self, payload: dict[str, Any], exclude_pk: ID | None = None
+    ) -> None:
+        """
+        Raise UserAlreadyExists if any login field from payload is taken.
+        All login fields are checked by one repository call.
+
+        :param payload: User fields
+        :param exclude_pk: Primary key of user which is updated
+        """
+        if self.settings.USER_UNIQUE_CHECK_OPTIMISTIC:
+            return
+
+        values = {
+            field: payload[field]
+            for field in self.settings.USER_LOGIN_FIELDS
+            if payload.get(field) is not None
+        }
+        if not values:
+            return
+
+        user = await self.user_repo.get_by_any_field(values, exclude_pk=exclude_pk)
+        if user is not None:
+            raise UserAlreadyExists()
+
     async def signup(self, payload: BaseUserCreate, safe: bool = True, **kwargs) -> UM:
         # Check if user already exist by login fields
-        for field in self.settings.USER_LOGIN_FIELDS:
-            if hasattr(payload, field):
-                user = await self.user_repo.get_by_field(field, getattr(payload, field))
-                if user is not None:
-                    raise FastAuthException(
-                        status.HTTP_400_BAD_REQUEST,
-                        "User already exists.",
-                        "User with provided credentials already exists.",
-                    )
+        payload_dict = payload.model_dump()
+        await self.check_user_exists(payload_dict)
 
         # Generate hash from password
-        payload_dict = payload.model_dump()
-        payload_dict["hashed_password"] = self.password_helper.hash(
+        payload_dict["hashed_password"] = await self._hash_password(
             payload_dict.pop("password")
         )
 
@@ -211,9 +498,93 @@ class BaseAuthService(Generic[UM, ID]):
                     "To use RBAC you need to implement IRoleRepository and pass it to role_repo argument of BaseAuthService"
                 )
         user = await self.user_repo.create(payload_dict)
+        await self.user_repo.commit()
         await self.on_after_register(user, kwargs.get("request", None))
         return user
 
+    async def signup_many(
+        self,
+        payloads: Iterable[BaseUserCreate | dict[str, Any]],
+        safe: bool = True,
+        batch_size: int = 1000,
+        executor: Executor | None = None,
+    ) -> int:
+        """
+        Import many users at once, e.g. on migration from another system.
+        Passwords are hashed in parallel and users are inserted in batches.
+
+        Payload may contain `hashed_password` instead of `password`: hash supported
+        by `password_helper` (e.g. bcrypt or argon2) is stored as is, outdated ones
+        are upgraded on login. Uniqueness is checked by DB constraints only,
+        batch with existing user raises UserAlreadyExists. `on_after_register`
+        is not called.
+
+        :param payloads: Users to create
+        :param safe: Use default is_active, is_verified and roles instead of provided
+        :param batch_size: Number of users inserted at once
+        :param executor: Thread or process pool for hashing, loop default executor if None
+        :return: Number of created users
+        """
+        roles_cache: dict[tuple[str, ...], list] = {}
+        payloads = iter(payloads)
+        created = 0
+        while batch := list(islice(payloads, batch_size)):
+            payload_dicts = [
+                dict(p) if isinstance(p, dict) else p.model_dump() for p in batch
+            ]
+            await self._hash_passwords(payload_dicts, executor)
+
+            for payload_dict in payload_dicts:
+                if safe:
+                    payload_dict["is_active"] = self.settings.DEFAULT_USER_IS_ACTIVE
+                    payload_dict["is_verified"] = self.settings.DEFAULT_USER_IS_VERIFIED
+                # Same rules as in signup, roles are resolved once per set of names
+                roles = payload_dict.pop("roles", [])
+                if len(roles) > 0:
+                    if self.role_repo is None:
+                        raise RuntimeError(
+                            "To use RBAC you need to implement IRoleRepository and pass it to role_repo argument of BaseAuthService"
+                        )
+                    names = tuple(self.settings.DEFAULT_USER_ROLES if safe else roles)
+                    if names not in roles_cache:
+                        roles_cache[names] = await self.role_repo.get_roles_by_list(
+                            list(names)
+                        )
+                    payload_dict["roles"] = roles_cache[names]
+
+            created += len(await self.user_repo.create_many(payload_dicts))
+            await self.user_repo.commit()
+        return created
+
+    async def _hash_passwords(
+        self, payloads: list[dict[str, Any]], executor: Executor | None = None
+    ) -> None:
+        loop = asyncio.get_running_loop()
+        hash_func = self.password_helper.hash
+        targets, jobs = [], []
+        for payload in payloads:
+            password = payload.pop("password", None)
+            if password is None:
+                hashed_password = payload.get("hashed_password")
+                if not hashed_password or not self.password_helper.identify(
+                    hashed_password
+                ):
+                    raise FastAuthException(
+                        status.HTTP_400_BAD_REQUEST,
+                        "Invalid password hash",
+                        f"Unsupported password hash of user {payload.get('email')}.",
+                    )
+                continue
+
+            targets.append(payload)
+            if inspect.iscoroutinefunction(hash_func):
+                jobs.append(hash_func(password))
+            else:
+                jobs.append(loop.run_in_executor(executor, hash_func, password))
+
+        for payload, hashed_password in zip(targets, await asyncio.gather(*jobs)):
+            payload["hashed_password"] = hashed_password
+
     async def oauth_callback(
         self: "BaseAuthService[UOAM, ID]",
         payload: OAuthCreate,
@@ -252,11 +623,7 @@ class BaseAuthService(Generic[UM, ID]):
             else:
                 # try to associate account
                 if not associate_by_email:
-                    raise FastAuthException(
-                        status.HTTP_400_BAD_REQUEST,
-                        "User already exists.",
-                        "User with provided credentials already exists.",
-                    )
+                    raise UserAlreadyExists()
                 user = await self.oauth_repo.create_and_add_to_user(
                     user, payload.model_dump()
                 )
@@ -275,19 +642,18 @@ class BaseAuthService(Generic[UM, ID]):
     async def patch_user(
         self, user: UM, payload: BaseUserUpdate, safe: bool = True, **kwargs
     ) -> UM:
-        for field in self.settings.USER_LOGIN_FIELDS:
-            if hasattr(payload, field):
-                user = await self.user_repo.get_by_field(field, getattr(payload, field))
-                if user is not None:
-                    raise FastAuthException(
-                        status.HTTP_400_BAD_REQUEST,
-                        "User already exists.",
-                        "User with provided credentials already exists.",
-                    )
-
         payload_dict = payload.model_dump(
             exclude_none=True, exclude_defaults=True, exclude_unset=True
         )
+        # Check only login fields which actually change
+        await self.check_user_exists(
+            {
+                field: value
+                for field, value in payload_dict.items()
+                if getattr(user, field, None) != value
+            },
+            exclude_pk=user.id,
+        )
 
         if safe:
             payload_dict.pop("is_active", None)
@@ -305,7 +671,7 @@ class BaseAuthService(Generic[UM, ID]):
                     payload_dict["roles"]
                 )
 
-        user = await self.user_repo.update(user, payload_dict)
+        user = await self.update_user(user, payload_dict)
         await self.on_after_user_update(user, payload, kwargs.get("request", None))
         return user
 
@@ -362,7 +728,7 @@ class BaseAuthService(Generic[UM, ID]):
                 status.HTTP_400_BAD_REQUEST, "User already verified."
             )
 
-        user = await self.user_repo.update(user, payload={"is_verified": True})
+        user = await self.update_user(user, {"is_verified": True})
         await self.on_after_verification(user, kwargs.get("request", None))
         return user
 
@@ -372,7 +738,7 @@ class BaseAuthService(Generic[UM, ID]):
 
         jwt_payload = JWTPayload(
             sub=str(user.id),
-            password_fgpt=self.password_helper.hash(user.hashed_password),
+            password_fgpt=await self._password_fingerprint(user.hashed_password),
             aud=self.settings.RESET_TOKEN_AUDIENCE,
             expires_in=self.settings.RESET_TOKEN_EXPIRE_SECONDS,
         )
@@ -388,18 +754,20 @@ class BaseAuthService(Generic[UM, ID]):
         )
         user_id = self.parse_user_id(decode_token.sub)
 
-        user = await self.user_repo.get_by_pk(user_id)
+        user = await self.user_repo.get_by_pk(user_id, load=LoadStrategy.AUTHENTICATE)
         user = await self.verify_user(user)
 
-        valid, _ = self.password_helper.verify_and_update(
-            user.hashed_password, decode_token.password_fgpt
+        valid = await self._verify_password_fingerprint(
+            user.hashed_password, getattr(decode_token, "password_fgpt", None)
         )
         if not valid:
             raise FastAuthException(status.HTTP_400_BAD_REQUEST, "Invalid reset token")
 
-        hashed_password = self.password_helper.hash(new_password)
-
-        user = await self.user_repo.update(user, {"hashed_password": hashed_password})
+        hashed_password = await self._hash_password(new_password)
+        user = await self.update_user(user, {"hashed_password": hashed_password})
+        if hasattr(user, "token_version"):
+            # Logout from all devices after password reset
+            await self._increment_token_version(user)
         await self.on_after_reset_password(user, kwargs.get("request", None))
         return user
 
@@ -415,6 +783,11 @@ class BaseAuthService(Generic[UM, ID]):
         Call after user login
         """
 
+    async def on_after_logout(self, user: UM, request: Request | None = None):
+        """
+        Call after user logout
+        """
+
     async def on_after_access_token_refresh(
         self, user: UM, tokens: TokenResponse, request: Request | None = None
     ):
@@ -0,0 +1,155 @@
+import asyncio
+import os
+from concurrent.futures import Executor
+from pathlib import Path
+from typing import Any, Callable, Generic
+
+from pydantic import BaseModel
+
+from fastauth.models import UM
+from fastauth.repositories import IUserRepository, LoadStrategy
+from fastauth.types import ID
+from fastauth.utils.password import (
+    IPasswordHelper,
+    PasswordHelper,
+    WrappedBcryptHasher,
+    describe_hash,
+)
+
+
+class PasswordMigrationReport(BaseModel):
+    """
+    Result of `PasswordMigrationJob`, also stored in checkpoint.
+    """
+
+    processed: int = 0
+    schemes: dict[str, dict[str, int]] = {}
+    outdated: int = 0
+    wrapped: int = 0
+    cursor: Any = None
+
+    def count(self, hashed_password: str | None) -> str:
+        scheme, params = describe_hash(hashed_password)
+        params_count = self.schemes.setdefault(scheme, {})
+        params_count[params] = params_count.get(params, 0) + 1
+        self.processed += 1
+        return scheme
+
+
+class PasswordMigrationJob(Generic[UM, ID]):
+    """
+    Offline job which walks over all users and reports how many password hashes
+    of each scheme and parameter set are stored. Hashes not produced by current
+    hasher are counted as outdated, they are upgraded on next login.
+
+    With `wrapper`, legacy bcrypt hashes of dormant users are wrapped by argon2 right away,
+    `password_helper` of application must include `WrappedBcryptHasher` to verify them.
+
+    Users are read by pages of `batch_size` and progress is saved to `checkpoint_path`
+    after every page, so interrupted job resumes from last written page.
+
+    :param user_repo: User repository, writes go through `update_hashed_passwords`
+    :param password_helper: Helper used by application
+    :param wrapper: Hasher used to wrap bcrypt hashes, only report is made if None
+    :param batch_size: Number of users loaded and written at once
+    :param max_concurrency: Max number of hashes wrapped at once
+    :param executor: Thread or process pool for wrapping, loop default executor if None
+    :param checkpoint_path: JSON file with progress, job starts from scratch if None
+    :param parse_cursor: Converts stored cursor back to primary key, e.g. `uuid.UUID`
+    """
+
+    def __init__(
+        self,
+        user_repo: IUserRepository[UM, ID],
+        password_helper: IPasswordHelper | None = None,
+        wrapper: WrappedBcryptHasher | None = None,
+        batch_size: int = 1000,
+        max_concurrency: int = 4,
+        executor: Executor | None = None,
+        checkpoint_path: str | Path | None = None,
+        parse_cursor: Callable[[Any], ID] | None = None,
+    ):
+        self.user_repo = user_repo
+        self.password_helper = password_helper or PasswordHelper()
+        self.wrapper = wrapper
+        self.batch_size = batch_size
+        self.max_concurrency = max_concurrency
+        self.executor = executor
+        self.checkpoint_path = Path(checkpoint_path) if checkpoint_path else None
+        self.parse_cursor = parse_cursor
+
+    async def run(self) -> PasswordMigrationReport:
+        if self.wrapper is not None and not self.password_helper.identify(
+            self.wrapper.PREFIX
+        ):
+            raise RuntimeError(
+                "To wrap bcrypt hashes you need to add WrappedBcryptHasher to password_hash of PasswordHelper"
+            )
+        report = self.load_checkpoint()
+        after = report.cursor
+        if after is not None and self.parse_cursor is not None:
+            after = self.parse_cursor(after)
+        slots = asyncio.Semaphore(self.max_concurrency)
+
+        while True:
+            users = await self.user_repo.get_many(
+                limit=self.batch_size, after=after, load=LoadStrategy.AUTHENTICATE
+            )
+            if not users:
+                break
+
+            to_wrap = {}
+            for user in users:
+                scheme = report.count(user.hashed_password)
+                if not user.hashed_password or not self.password_helper.needs_rehash(
+                    user.hashed_password
+                ):
+                    continue
+                report.outdated += 1
+                if self.wrapper is not None and scheme == "bcrypt":
+                    to_wrap[user.id] = user.hashed_password
+
+            if to_wrap:
+                hashes = await asyncio.gather(
+                    *(self._wrap(slots, h) for h in to_wrap.values())
+                )
+                await self.user_repo.update_hashed_passwords(
+                    {
+                        user_id: (old_hash, new_hash)
+                        for (user_id, old_hash), new_hash in zip(
+                            to_wrap.items(), hashes
+                        )
+                    }
+                )
+                # Checkpoint must not get ahead of stored hashes
+                await self.user_repo.commit()
+                report.wrapped += len(to_wrap)
+
+            after = self.user_repo.get_cursor(users[-1])
+            report.cursor = after
+            self.save_checkpoint(report)
+            if len(users) < self.batch_size:
+                break
+
+        return report
+
+    async def _wrap(self, slots: asyncio.Semaphore, bcrypt_hash: str) -> str:
+        async with slots:
+            return await asyncio.get_running_loop().run_in_executor(
+                self.executor, self.wrapper.wrap, bcrypt_hash
+            )
+
+    def load_checkpoint(self) -> PasswordMigrationReport:
+        if self.checkpoint_path is None or not self.checkpoint_path.exists():
+            return PasswordMigrationReport()
+        return PasswordMigrationReport.model_validate_json(
+            self.checkpoint_path.read_text()
+        )
+
+    def save_checkpoint(self, report: PasswordMigrationReport) -> None:
+        if self.checkpoint_path is None:
+            return
+        # Write to temporary file first, so interrupted write doesn't corrupt checkpoint
+        tmp_path = self.checkpoint_path.with_suffix(".tmp")
+        tmp_path.write_text(report.model_dump_json())
+        os.replace(tmp_path, self.checkpoint_path)
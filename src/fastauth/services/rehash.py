@@ -0,0 +1,116 @@
+import asyncio
+from itertools import islice
+from typing import Awaitable, Callable, Generic
+
+from fastauth.types import ID
+
+
+class RehashQueue(Generic[ID]):
+    """
+    Write-behind queue for password hashes upgraded on login.
+    Hashes are collected per user (newer hash replaces older one) and written
+    by `writer` in batches from background task, with retries.
+
+    Every entry keeps hash which was replaced, writer must store new hash only if user
+    still has this one (compare-and-set), so delayed write doesn't undo password change.
+
+    Writer runs outside of request, so it must open its own session,
+    e.g. call `IUserRepository.update_hashed_passwords` with new repository.
+    Batch which fails `max_retries` times is dropped: user keeps old hash,
+    which is still valid and will be upgraded again on next login.
+
+    :param writer: Coroutine function which stores mapping of user id to pair of old and new hash
+    :param batch_size: Max number of hashes written by one `writer` call
+    :param flush_interval: Seconds to collect hashes before writing
+    :param max_retries: Number of retries of failed batch
+    :param retry_delay: Delay before first retry, doubled on every next one
+    """
+
+    def __init__(
+        self,
+        writer: Callable[[dict[ID, tuple[str, str]]], Awaitable[None]],
+        batch_size: int = 100,
+        flush_interval: float = 1.0,
+        max_retries: int = 3,
+        retry_delay: float = 1.0,
+    ):
+        self.writer = writer
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+        self._pending: dict[ID, tuple[str, str]] = {}
+        self._task: asyncio.Task | None = None
+        self._wakeup = asyncio.Event()
+        self._lock = asyncio.Lock()
+
+        self.submitted = 0
+        self.written = 0
+        self.failed = 0
+        self.last_error: Exception | None = None
+
+    def submit(self, user_id: ID, old_hash: str, new_hash: str) -> None:
+        """
+        Schedule hash write, doesn't wait for it.
+
+        :param user_id: User id
+        :param old_hash: Hash which was verified, write is skipped if it was changed
+        :param new_hash: Upgraded hash
+        """
+        self._pending[user_id] = (old_hash, new_hash)
+        self.submitted += 1
+        if len(self._pending) >= self.batch_size:
+            self._wakeup.set()
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    def discard(self, user_id: ID) -> None:
+        """
+        Drop pending hash of user, e.g. when password is changed.
+        """
+        self._pending.pop(user_id, None)
+
+    async def flush(self) -> None:
+        """
+        Write all pending hashes now.
+        """
+        async with self._lock:
+            while self._pending:
+                batch = dict(islice(self._pending.items(), self.batch_size))
+                for user_id in batch:
+                    del self._pending[user_id]
+                await self._write(batch)
+
+    async def close(self) -> None:
+        """
+        Write pending hashes and stop background task, call it on app shutdown.
+        """
+        await self.flush()
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def _run(self) -> None:
+        while self._pending:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.flush_interval)
+            except TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self.flush()
+
+    async def _write(self, batch: dict[ID, tuple[str, str]]) -> None:
+        for attempt in range(self.max_retries + 1):
+            try:
+                await self.writer(batch)
+            except Exception as e:
+                self.last_error = e
+                if attempt < self.max_retries:
+                    await asyncio.sleep(self.retry_delay * 2**attempt)
+            else:
+                self.written += len(batch)
+                return
+        self.failed += len(batch)
+
+    def __len__(self) -> int:
+        return len(self._pending)
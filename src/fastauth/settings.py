@@ -1,3 +1,4 @@
+from typing import Literal
 from pydantic_settings import BaseSettings
 from pydantic import Field
 
@@ -12,7 +13,30 @@ class FastAuthSettings(BaseSettings):
     OAUTH_ASSOCIATE_BY_EMAIL: bool = False
     DEFAULT_USER_ROLES: list[str] = ["USER"]
     USER_LOGIN_FIELDS: list[str] = ["email"]
+    # Skip "user exists" query on signup and patch, rely on DB unique constraints instead.
+    # User repository must raise UserAlreadyExists on constraint violation
+    USER_UNIQUE_CHECK_OPTIMISTIC: bool = False
     USE_REFRESH_TOKEN: bool = True
+    # Authorize require_* dependencies by token claims only, without loading user
+    STATELESS_AUTHORIZATION: bool = False
+    STATELESS_AUTHORIZATION_MAX_AGE_SECONDS: int | None = None
+    # Process-wide cache of users token_version (see TokenVersionMixin), TTL bounds
+    # how long "logout all" made by another process takes to take effect
+    TOKEN_VERSION_CACHE_SIZE: int = 10_000
+    TOKEN_VERSION_CACHE_TTL_SECONDS: int = 30
+
+    # PASSWORD HASHING
+    # Max number of hashes computed at once, other requests get overload status code.
+    # Requires AsyncPasswordHelper: synchronous hashing blocks event loop, so slots never overlap
+    PASSWORD_HASH_MAX_CONCURRENCY: int | None = None
+    PASSWORD_HASH_RETRY_AFTER_SECONDS: int = 1
+    PASSWORD_HASH_OVERLOAD_STATUS_CODE: Literal[429, 503] = 503
+    # Budget of calibrate_argon2: target duration of one hash, memory cap in KiB and lanes cap
+    PASSWORD_HASH_TARGET_MS: int = 100
+    PASSWORD_HASH_MAX_MEMORY_KIB: int = 64 * 1024
+    PASSWORD_HASH_MAX_PARALLELISM: int = 4
+    # Argon2 parameters shared by all nodes, e.g. "m=65536,t=2,p=4", skip calibrate_argon2 benchmark
+    PASSWORD_HASH_ARGON2_PARAMS: str | None = None
 
     # ROUTER
     LOGIN_URL: str = "/api/auth/login"
@@ -22,8 +46,14 @@ class FastAuthSettings(BaseSettings):
     # JWT
     SECRET_KEY: str = ""
     JWT_ALGORITHM: str = "HS256"
+    # Public keys of KeyRing, see get_jwks_router
+    JWKS_URL: str = "/.well-known/jwks.json"
+    JWKS_MAX_AGE_SECONDS: int = 60 * 60
     ACCESS_TOKEN_EXPIRE_SECONDS: int = 60 * 60 * 24
     ACCESS_TOKEN_AUDIENCE: list[str] = ["fastauth:auth"]
+    # "bitmask" stores permissions as bits of PermissionRegistry, see JWTTokenStorage,
+    # "roles" stores only roles, permissions are expanded by RolePermissionCache
+    ACCESS_TOKEN_PERMISSIONS_FORMAT: Literal["list", "bitmask", "roles"] = "list"
     REFRESH_TOKEN_EXPIRE_SECONDS: int = 60 * 60 * 24 * 30
     STATE_TOKEN_AUDIENCE: list[str] = ["fastauth:state"]
     STATE_TOKEN_EXPIRE_SECONDS: int = 60 * 60 * 10
@@ -31,6 +61,7 @@ class FastAuthSettings(BaseSettings):
     VERIFICATION_TOKEN_EXPIRE_SECONDS: int = 60 * 60 * 10
     RESET_TOKEN_AUDIENCE: list[str] = ["fastauth:reset"]
     RESET_TOKEN_EXPIRE_SECONDS: int = 60 * 60 * 10
+    RESET_TOKEN_FINGERPRINT: Literal["hmac", "hash"] = "hmac"
 
     # COOKIES
     COOKIE_ACCESS_TOKEN_NAME: str = "access_token"
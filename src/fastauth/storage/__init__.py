@@ -1,3 +1,25 @@
 from .jwt import JWTTokenStorage
+from .revocation import (
+    BaseRevocationBackend,
+    InMemoryRevocationBackend,
+    RevocationList,
+)
+from .users import (
+    BaseUserCache,
+    InMemoryUserCache,
+    UserSnapshot,
+    get_token_version_cache,
+)
+from .roles import RolePermissionCache
 
-__all__ = ["JWTTokenStorage"]
+__all__ = [
+    "JWTTokenStorage",
+    "BaseRevocationBackend",
+    "InMemoryRevocationBackend",
+    "RevocationList",
+    "BaseUserCache",
+    "InMemoryUserCache",
+    "UserSnapshot",
+    "get_token_version_cache",
+    "RolePermissionCache",
+]
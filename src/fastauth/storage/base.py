@@ -1,31 +1,28 @@
 from abc import abstractmethod, ABC
 
-from fastauth.schemas.auth import TokenData
+from fastauth.schemas.auth import TokenData, TokenClaims
 from fastauth.settings import FastAuthSettings
+from fastauth.storage.revocation import RevocationList
 
 
 class BaseTokenStorage(ABC):
-    def __init__(self, settings: FastAuthSettings):
+    def __init__(
+        self, settings: FastAuthSettings, revocation: RevocationList | None = None
+    ):
         self.settings = settings
+        self.revocation = revocation
 
-    # @abstractmethod
-    # async def store_token(self, jti: str, token_data: TokenData, ttl: int) -> None:
-    #     raise NotImplementedError
-    #
-    # @abstractmethod
-    # async def get_token(self, jti: str) -> TokenData | None:
-    #     raise NotImplementedError
-    #
-    # @abstractmethod
-    # async def revoke_token(self, jti: str) -> None:
-    #     raise NotImplementedError
-    #
-    # @abstractmethod
-    # async def is_token_revoked(self, jti: str) -> bool:
-    #     raise NotImplementedError
+    async def revoke_token(self, jti: str, expires_at: float | None = None) -> None:
+        if self.revocation is not None:
+            await self.revocation.revoke(jti, expires_at)
+
+    async def is_token_revoked(self, jti: str) -> bool:
+        if self.revocation is None:
+            return False
+        return await self.revocation.is_revoked(jti)
 
     @abstractmethod
-    def decode_token(self, token: str) -> TokenData:
+    def decode_token(self, token: str) -> TokenData | TokenClaims:
         raise NotImplementedError
 
     @abstractmethod
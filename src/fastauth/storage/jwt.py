@@ -1,25 +1,82 @@
+import hashlib
+
 from .base import BaseTokenStorage
-from fastauth.schemas.auth import TokenData
-from fastauth.utils.jwt_helper import to_jwt_token, to_jwt_payload, JWTPayload
+from fastauth.exceptions import FastAuthException, status
+from fastauth.schemas.auth import TokenData, TokenClaims, TokenType
+from fastauth.settings import FastAuthSettings
+from fastauth.storage.revocation import RevocationList
+from fastauth.utils.cache import TTLCache
+from fastauth.utils.keyring import KeyRing
+from fastauth.utils.jwt_helper import to_jwt_token, to_jwt_claims, JWTPayload
+from fastauth.utils.permissions import PermissionRegistry
+
+PERMISSIONS_MASK_CLAIM = "pms"
+PERMISSIONS_VERSION_CLAIM = "pmv"
 
 
 class JWTTokenStorage(BaseTokenStorage):
-    # async def store_token(self, jti: str, token_data: TokenData, ttl: int) -> None:
-    #     pass
-    #
-    # async def revoke_token(self, jti: str) -> None:
-    #     pass
-    #
-    # async def is_token_revoked(self, jti: str) -> bool:
-    #     return False
-    #
-    # async def get_token(self, jti: str) -> TokenData | None:
-    #     pass
-
-    def decode_token(self, token: str) -> TokenData:
-        decoded = to_jwt_payload(
-            self.settings, token, audience=self.settings.ACCESS_TOKEN_AUDIENCE
+    def __init__(
+        self,
+        settings: FastAuthSettings,
+        cache: TTLCache[bytes, TokenData | TokenClaims] | None = None,
+        revocation: RevocationList | None = None,
+        permission_registry: PermissionRegistry | None = None,
+        keyring: KeyRing | None = None,
+    ):
+        """
+        :param settings: FastAuth settings
+        :param cache: Optional cache of already verified tokens, shared between requests.
+            Cached tokens are returned as is, so treat them as read-only.
+        :param revocation: Optional list of revoked tokens, shared between requests
+        :param permission_registry: Registry used to encode permissions as bitmask,
+            required if `ACCESS_TOKEN_PERMISSIONS_FORMAT` is "bitmask"
+        :param keyring: Asymmetric keys used to sign and verify tokens instead of `SECRET_KEY`
+        """
+        super().__init__(settings, revocation)
+        self.cache = cache
+        self.permission_registry = permission_registry
+        self.keyring = keyring
+        self._keyring_generation = keyring.generation if keyring is not None else 0
+
+    def decode_token(self, token: str) -> TokenData | TokenClaims:
+        if self.cache is None:
+            return self._decode_token(token)
+
+        if (
+            self.keyring is not None
+            and self.keyring.generation != self._keyring_generation
+        ):
+            # Keys changed, tokens signed by removed key must not be served from cache
+            self.cache.clear()
+            self._keyring_generation = self.keyring.generation
+
+        key = hashlib.sha256(token.encode()).digest()
+        token_data = self.cache.get(key)
+        if token_data is None:
+            token_data = self._decode_token(token)
+            expires_at = token_data.exp.timestamp() if token_data.exp else None
+            self.cache.set(key, token_data, expires_at)
+        return token_data
+
+    def _decode_token(self, token: str) -> TokenData | TokenClaims:
+        claims = to_jwt_claims(
+            self.settings,
+            token,
+            self.keyring,
+            audience=self.settings.ACCESS_TOKEN_AUDIENCE,
         )
+        if PERMISSIONS_MASK_CLAIM in claims:
+            self._expand_permissions(claims)
+        # Access tokens are verified on every request, so skip pydantic for them
+        if claims.get("token_type") == TokenType.ACCESS:
+            try:
+                return TokenClaims.from_claims(claims)
+            except (KeyError, TypeError, ValueError) as e:
+                raise FastAuthException(
+                    status.HTTP_400_BAD_REQUEST, "Invalid token", "Invalid token", e
+                )
+
+        decoded = JWTPayload.from_claims(claims)
         if decoded.exp:
             expires_in = int(decoded.exp.timestamp()) - int(decoded.iat.timestamp())
         else:
@@ -29,7 +86,42 @@ class JWTTokenStorage(BaseTokenStorage):
             **decoded.model_dump(), user_id=decoded.sub, expires_in=expires_in
         )
 
+    def _expand_permissions(self, claims: dict) -> None:
+        if self.permission_registry is None:
+            raise FastAuthException(
+                status.HTTP_500_INTERNAL_SERVER_ERROR,
+                "Internal Server Error",
+                "Permission registry is not configured",
+            )
+        try:
+            permissions = self.permission_registry.decode(
+                claims.pop(PERMISSIONS_MASK_CLAIM),
+                claims.pop(PERMISSIONS_VERSION_CLAIM, 0),
+            )
+        except (TypeError, ValueError) as e:
+            raise FastAuthException(
+                status.HTTP_400_BAD_REQUEST, "Invalid token", "Invalid token", e
+            )
+        claims["permissions"] = [*permissions, *claims.get("permissions", [])]
+
     def encode_token(self, payload: TokenData) -> str:
+        permissions = payload.permissions
+        extra_claims = {}
+        if (
+            self.settings.ACCESS_TOKEN_PERMISSIONS_FORMAT == "bitmask"
+            and payload.token_type == TokenType.ACCESS
+            and permissions
+        ):
+            if self.permission_registry is None:
+                raise RuntimeError(
+                    "To use bitmask permissions format you need to pass PermissionRegistry to permission_registry argument of JWTTokenStorage"
+                )
+            mask, permissions = self.permission_registry.encode(permissions)
+            extra_claims = {
+                PERMISSIONS_MASK_CLAIM: mask,
+                PERMISSIONS_VERSION_CLAIM: self.permission_registry.version,
+            }
+
         jwt_payload = JWTPayload(
             sub=payload.user_id,
             aud=self.settings.ACCESS_TOKEN_AUDIENCE,
@@ -38,6 +130,10 @@ class JWTTokenStorage(BaseTokenStorage):
             token_type=payload.token_type,
             email=payload.email,
             roles=payload.roles,
-            permissions=payload.permissions,
+            permissions=permissions,
+            token_version=payload.token_version,
+            roles_version=payload.roles_version,
+            session_id=payload.session_id,
+            **extra_claims,
         )
-        return to_jwt_token(self.settings, jwt_payload)
+        return to_jwt_token(self.settings, jwt_payload, self.keyring)
@@ -0,0 +1,136 @@
+import asyncio
+import time
+from abc import ABC, abstractmethod
+
+
+class BaseRevocationBackend(ABC):
+    """
+    Shared store of revoked token ids (jti), e.g. database or Redis.
+    """
+
+    @abstractmethod
+    async def revoke(self, jti: str, expires_at: float | None = None) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def is_revoked(self, jti: str) -> bool:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def get_revoked(self, since: float | None = None) -> dict[str, float | None]:
+        """
+        Return not expired revoked tokens as `{jti: expires_at}`
+        :param since: Only tokens revoked at or after this timestamp
+        """
+        raise NotImplementedError
+
+    async def purge_expired(self) -> None:
+        """
+        Remove revoked tokens which are already expired
+        """
+
+
+class InMemoryRevocationBackend(BaseRevocationBackend):
+    def __init__(self):
+        # jti -> (expires_at, revoked_at)
+        self._revoked: dict[str, tuple[float | None, float]] = {}
+
+    async def revoke(self, jti: str, expires_at: float | None = None) -> None:
+        self._revoked[jti] = (expires_at, time.time())
+
+    async def is_revoked(self, jti: str) -> bool:
+        item = self._revoked.get(jti)
+        return item is not None and (item[0] is None or item[0] > time.time())
+
+    async def get_revoked(self, since: float | None = None) -> dict[str, float | None]:
+        now = time.time()
+        return {
+            jti: expires_at
+            for jti, (expires_at, revoked_at) in self._revoked.items()
+            if (since is None or revoked_at >= since)
+            and (expires_at is None or expires_at > now)
+        }
+
+    async def purge_expired(self) -> None:
+        now = time.time()
+        self._revoked = {
+            jti: item
+            for jti, item in self._revoked.items()
+            if item[0] is None or item[0] > now
+        }
+
+
+class RevocationList:
+    """
+    In-process copy of revoked tokens, shared between requests.
+
+    Lookups are answered from memory, the backend is only queried to pull
+    revocations made by other processes, at most once per `sync_interval` seconds.
+    Entries are evicted when the token expires.
+
+    :param backend: Shared revocation store
+    :param sync_interval: How often to pull new revocations from backend
+    """
+
+    # Pull a bit of history on every sync, to tolerate clock skew between processes
+    SYNC_OVERLAP_SECONDS = 1.0
+
+    def __init__(self, backend: BaseRevocationBackend, sync_interval: float = 5.0):
+        self.backend = backend
+        self.sync_interval = sync_interval
+        self._revoked: dict[str, float | None] = {}
+        self._synced_at: float | None = None
+        self._sync_lock = asyncio.Lock()
+
+    async def revoke(self, jti: str, expires_at: float | None = None) -> None:
+        await self.backend.revoke(jti, expires_at)
+        self._revoked[jti] = expires_at
+
+    async def is_revoked(self, jti: str) -> bool:
+        if self._is_revoked_locally(jti):
+            return True
+        if self._sync_required():
+            await self.sync()
+            return self._is_revoked_locally(jti)
+        return False
+
+    async def sync(self) -> None:
+        if self._sync_lock.locked():
+            # Another request is already syncing, don't block on it
+            return
+        async with self._sync_lock:
+            started_at = time.time()
+            since = None
+            if self._synced_at is not None:
+                since = self._synced_at - self.SYNC_OVERLAP_SECONDS
+            revoked = await self.backend.get_revoked(since)
+            self._revoked.update(revoked)
+            self._evict_expired(started_at)
+            self._synced_at = started_at
+
+    def _sync_required(self) -> bool:
+        return (
+            self._synced_at is None
+            or time.time() - self._synced_at >= self.sync_interval
+        )
+
+    def _is_revoked_locally(self, jti: str) -> bool:
+        if jti not in self._revoked:
+            return False
+        expires_at = self._revoked[jti]
+        if expires_at is not None and expires_at <= time.time():
+            del self._revoked[jti]
+            return False
+        return True
+
+    def _evict_expired(self, now: float) -> None:
+        expired = [
+            jti
+            for jti, expires_at in self._revoked.items()
+            if expires_at is not None and expires_at <= now
+        ]
+        for jti in expired:
+            del self._revoked[jti]
+
+    def __len__(self) -> int:
+        return len(self._revoked)
@@ -0,0 +1,113 @@
+from typing import Iterable
+
+from fastauth.repositories.roles import IRoleRepository
+from fastauth.utils.cache import TTLCache
+
+
+class RolePermissionCache:
+    """
+    Process-wide cache of role -> permissions mapping, filled from `IRoleRepository`
+    (lazily or by `warmup`). Used to mint access tokens without loading
+    permissions of user roles, and to expand permissions of access tokens
+    which carry only role names.
+
+    `version` is stored in issued tokens. Call `invalidate` when roles or their
+    permissions change: it drops changed roles and bumps version. If token has
+    newer version than cache (roles were changed by another process),
+    cache is reloaded.
+
+    Version is local to process, so other processes don't see the change until
+    their entries expire after `ttl`. To apply it everywhere at once, keep version
+    in shared storage (e.g. Redis counter) and pass it to `invalidate(version=...)`
+    of every process.
+
+    :param maxsize: Maximum number of cached roles
+    :param ttl: Lifetime of cached role in seconds, bounds staleness between processes
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 60):
+        if ttl is None or ttl <= 0:
+            raise ValueError(
+                "RolePermissionCache ttl must be positive, it bounds staleness between processes"
+            )
+        self.version = 1
+        self._roles: TTLCache[str, tuple[str, ...]] = TTLCache(maxsize, ttl)
+        self._role_sets: TTLCache[frozenset[str], list[str]] = TTLCache(maxsize, ttl)
+
+    async def warmup(self, role_repo: IRoleRepository) -> None:
+        """
+        Load all roles from repository, e.g. on application startup
+        """
+        version = self.version
+        roles = await role_repo.get_many()
+        if version != self.version:
+            return
+        for role in roles:
+            self.set_role(role.name, self._role_permissions(role))
+
+    async def get_permissions(
+        self,
+        roles: Iterable[str],
+        role_repo: IRoleRepository,
+        version: int | None = None,
+    ) -> list[str]:
+        """
+        Return permissions of all roles. Returned list is shared, treat it as read-only.
+
+        :param roles: Role names
+        :param role_repo: Repository used to load missing roles
+        :param version: Version of role set stored in token
+        """
+        if version is not None and version > self.version:
+            self.invalidate(version=version)
+
+        key = frozenset(roles)
+        permissions = self._role_sets.get(key)
+        if permissions is not None:
+            return permissions
+
+        role_permissions = {role: self._roles.get(role) for role in key}
+        missing = [role for role, perms in role_permissions.items() if perms is None]
+        if missing:
+            loaded_version = self.version
+            for role in await role_repo.get_roles_by_list(missing):
+                role_permissions[role.name] = self._role_permissions(role)
+            # Unknown roles are remembered too, so they are not queried on every request
+            for role in missing:
+                if role_permissions[role] is None:
+                    role_permissions[role] = ()
+            if loaded_version != self.version:
+                # Invalidated while loading, loaded roles may be already outdated
+                return self._merge(role_permissions.values())
+            for role in missing:
+                self.set_role(role, role_permissions[role])
+
+        permissions = self._merge(role_permissions.values())
+        self._role_sets.set(key, permissions)
+        return permissions
+
+    @staticmethod
+    def _role_permissions(role) -> tuple[str, ...]:
+        return tuple(f"{perm.resource}:{perm.action}" for perm in role.permissions)
+
+    @staticmethod
+    def _merge(role_permissions: Iterable[tuple[str, ...]]) -> list[str]:
+        return list(dict.fromkeys(perm for perms in role_permissions for perm in perms))
+
+    def set_role(self, name: str, permissions: Iterable[str]) -> None:
+        self._roles.set(name, tuple(permissions))
+
+    def invalidate(self, *roles: str, version: int | None = None) -> None:
+        """
+        Drop cached roles and bump version.
+
+        :param roles: Names of changed roles, all roles are dropped if not provided
+        :param version: Set version explicitly, e.g. from shared counter
+        """
+        if roles:
+            for role in roles:
+                self._roles.pop(role)
+        else:
+            self._roles.clear()
+        self._role_sets.clear()
+        self.version = version if version is not None else self.version + 1
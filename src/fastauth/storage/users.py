@@ -0,0 +1,101 @@
+from abc import ABC, abstractmethod
+from enum import Enum
+from functools import cache
+from types import SimpleNamespace
+from typing import Any, Generic
+
+from fastauth.settings import FastAuthSettings
+from fastauth.types import ID
+from fastauth.utils.cache import TTLCache
+
+
+class UserSnapshot(SimpleNamespace):
+    """
+    Detached copy of user loaded attributes, safe to share between requests
+    """
+
+
+def make_snapshot(instance: Any, depth: int = 2) -> UserSnapshot:
+    """
+    Copy public loaded attributes of ORM instance, including loaded relationships
+    (e.g. roles and their permissions) up to `depth` levels.
+    """
+    data = {}
+    for key, value in vars(instance).items():
+        if key.startswith("_"):
+            continue
+        if isinstance(value, (list, tuple, set)):
+            if depth <= 0:
+                continue
+            value = [
+                make_snapshot(item, depth - 1) if _is_instance(item) else item
+                for item in value
+            ]
+        elif _is_instance(value):
+            if depth <= 0:
+                continue
+            value = make_snapshot(value, depth - 1)
+        data[key] = value
+    return UserSnapshot(**data)
+
+
+def _is_instance(value: Any) -> bool:
+    return hasattr(value, "__dict__") and not isinstance(value, Enum)
+
+
+class BaseUserCache(Generic[ID], ABC):
+    @abstractmethod
+    async def get(self, user_id: ID) -> UserSnapshot | None:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def set(self, user_id: ID, user: Any) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def invalidate(self, user_id: ID) -> None:
+        raise NotImplementedError
+
+
+class InMemoryUserCache(BaseUserCache[ID]):
+    """
+    Process-wide user cache, stores detached snapshots of users.
+
+    :param maxsize: Max number of cached users
+    :param ttl: Seconds before cached user is loaded from DB again
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 60):
+        self._cache: TTLCache[ID, UserSnapshot] = TTLCache(maxsize, ttl)
+
+    @property
+    def hits(self) -> int:
+        return self._cache.hits
+
+    @property
+    def misses(self) -> int:
+        return self._cache.misses
+
+    async def get(self, user_id: ID) -> UserSnapshot | None:
+        return self._cache.get(user_id)
+
+    async def set(self, user_id: ID, user: Any) -> None:
+        self._cache.set(user_id, make_snapshot(user))
+
+    async def invalidate(self, user_id: ID) -> None:
+        self._cache.pop(user_id)
+
+
+@cache
+def _get_token_version_cache(maxsize: int, ttl: int) -> TTLCache[str, int | None]:
+    return TTLCache(maxsize, ttl)
+
+
+def get_token_version_cache(settings: FastAuthSettings) -> TTLCache[str, int | None]:
+    """
+    Return process-wide cache of users token versions, shared by all services
+    created with the same settings values.
+    """
+    return _get_token_version_cache(
+        settings.TOKEN_VERSION_CACHE_SIZE, settings.TOKEN_VERSION_CACHE_TTL_SECONDS
+    )
@@ -2,9 +2,11 @@ import jwt
 from jwt import decode, encode
 from pydantic import BaseModel, Field, ConfigDict, model_validator
 from datetime import datetime
+from typing import Any
 
 from fastauth.settings import FastAuthSettings
 from fastauth.exceptions import FastAuthException, status
+from fastauth.utils.keyring import KeyRing
 from fastauth.utils.time import now
 from datetime import timedelta
 
@@ -37,25 +39,18 @@ class JWTPayload(BaseModel):
 
         return data
 
-    def to_token(self, key: str, algorithm: str = "HS256", **kwargs) -> str:
+    def to_token(self, key: Any, algorithm: str = "HS256", **kwargs) -> str:
         payload = self.model_dump(exclude_none=True)
         return encode(payload, key=key, algorithm=algorithm, **kwargs)
 
     @classmethod
     def from_token(cls, token: str, key: str, algorithm: str = "HS256", **kwargs):
+        return cls.from_claims(decode_jwt(token, key, algorithm, **kwargs))
+
+    @classmethod
+    def from_claims(cls, payload: dict):
         try:
-            payload = decode(token, key=key, algorithms=[algorithm], **kwargs)
             return cls.model_validate(payload)
-        except jwt.ExpiredSignatureError as e:
-            raise FastAuthException(
-                status.HTTP_400_BAD_REQUEST, "Expired token", "Token expired", e
-            )
-
-        except jwt.InvalidTokenError as e:
-            raise FastAuthException(
-                status.HTTP_400_BAD_REQUEST, "Invalid token", "Invalid token", e
-            )
-
         except Exception as e:
             raise FastAuthException(
                 status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -65,7 +60,42 @@ class JWTPayload(BaseModel):
             )
 
 
-def to_jwt_token(settings: FastAuthSettings, payload: JWTPayload, **kwargs) -> str:
+def decode_jwt(token: str, key: Any, algorithm: str = "HS256", **kwargs) -> dict:
+    try:
+        return decode(token, key=key, algorithms=[algorithm], **kwargs)
+    except jwt.ExpiredSignatureError as e:
+        raise FastAuthException(
+            status.HTTP_400_BAD_REQUEST, "Expired token", "Token expired", e
+        )
+
+    except jwt.InvalidTokenError as e:
+        raise FastAuthException(
+            status.HTTP_400_BAD_REQUEST, "Invalid token", "Invalid token", e
+        )
+
+    except Exception as e:
+        raise FastAuthException(
+            status.HTTP_500_INTERNAL_SERVER_ERROR,
+            "Internal Server Error",
+            "Error when decoding token",
+            e,
+        )
+
+
+def to_jwt_token(
+    settings: FastAuthSettings,
+    payload: JWTPayload,
+    keyring: KeyRing | None = None,
+    **kwargs,
+) -> str:
+    """
+    Sign token by `SECRET_KEY`, or by active key of `keyring` with its `kid` in header
+    """
+    if keyring is not None:
+        key = keyring.active
+        return payload.to_token(
+            key.private_key, key.algorithm, headers={"kid": key.kid}, **kwargs
+        )
     return payload.to_token(settings.SECRET_KEY, settings.JWT_ALGORITHM, **kwargs)
 
 
@@ -75,4 +105,35 @@ def to_jwt_payload(settings: FastAuthSettings, token: str, **kwargs) -> JWTPaylo
     )
 
 
-__all__ = ["JWTPayload", "to_jwt_token", "to_jwt_payload"]
+def to_jwt_claims(
+    settings: FastAuthSettings, token: str, keyring: KeyRing | None = None, **kwargs
+) -> dict:
+    """
+    Verify token by `SECRET_KEY`, or by key of `keyring` from `kid` header of token
+    """
+    if keyring is not None:
+        key = keyring.get(_get_kid(token))
+        if key is None:
+            raise FastAuthException(
+                status.HTTP_400_BAD_REQUEST, "Invalid token", "Unknown token key"
+            )
+        return decode_jwt(token, key.public_key, key.algorithm, **kwargs)
+    return decode_jwt(token, settings.SECRET_KEY, settings.JWT_ALGORITHM, **kwargs)
+
+
+def _get_kid(token: str) -> str | None:
+    try:
+        return jwt.get_unverified_header(token).get("kid")
+    except jwt.InvalidTokenError as e:
+        raise FastAuthException(
+            status.HTTP_400_BAD_REQUEST, "Invalid token", "Invalid token", e
+        )
+
+
+__all__ = [
+    "JWTPayload",
+    "decode_jwt",
+    "to_jwt_token",
+    "to_jwt_payload",
+    "to_jwt_claims",
+]
@@ -0,0 +1,132 @@
+import hashlib
+import json
+from typing import Any, Iterable
+
+from jwt.algorithms import get_default_algorithms
+
+ASYMMETRIC_ALGORITHMS = ("RS256", "ES256", "EdDSA")
+
+
+def _require_cryptography(algorithm: str) -> None:
+    if algorithm not in get_default_algorithms():
+        raise ImportError(
+            f"To use {algorithm} algorithm you need to install cryptography package: pip install fastapi-fastauth[keys]"
+        )
+
+
+class SigningKey:
+    """
+    Parsed asymmetric key of `KeyRing`. Key objects are created once,
+    so PEM is not parsed on every signed or verified token.
+
+    :param kid: Key id, stored in `kid` header of token
+    :param algorithm: One of RS256, ES256 or EdDSA
+    :param key: Private key, or public key for verify-only (retired or external) keys,
+        PEM string or `cryptography` key object
+    """
+
+    __slots__ = ("kid", "algorithm", "private_key", "public_key")
+
+    def __init__(self, kid: str, algorithm: str, key: Any):
+        if algorithm not in ASYMMETRIC_ALGORITHMS:
+            raise ValueError(
+                f"Unsupported algorithm {algorithm}, use one of {ASYMMETRIC_ALGORITHMS}"
+            )
+        _require_cryptography(algorithm)
+
+        parsed = get_default_algorithms()[algorithm].prepare_key(key)
+        self.kid = kid
+        self.algorithm = algorithm
+        if hasattr(parsed, "public_key"):
+            self.private_key = parsed
+            self.public_key = parsed.public_key()
+        else:
+            self.private_key = None
+            self.public_key = parsed
+
+    def to_jwk(self) -> dict[str, Any]:
+        jwk = get_default_algorithms()[self.algorithm].to_jwk(
+            self.public_key, as_dict=True
+        )
+        return {**jwk, "kid": self.kid, "alg": self.algorithm, "use": "sig"}
+
+    def __repr__(self):
+        return f"SigningKey(kid={self.kid!r}, algorithm={self.algorithm!r})"
+
+
+class KeyRing:
+    """
+    In-memory set of asymmetric keys indexed by `kid`.
+    Tokens are signed by active key, and verified by key from their `kid` header,
+    so services which only verify tokens need public keys (see JWKS router) instead of secret.
+
+    To rotate keys add new active key and keep old one until tokens signed by it expire.
+    `generation` changes on every add and remove, so caches of verified tokens
+    can drop tokens verified by removed key.
+
+    :param keys: Initial keys, last one with private key becomes active
+    """
+
+    def __init__(self, keys: Iterable[SigningKey] = ()):
+        _require_cryptography(ASYMMETRIC_ALGORITHMS[0])
+        self._keys: dict[str, SigningKey] = {}
+        self._active: SigningKey | None = None
+        self._jwks: bytes | None = None
+        self._etag: str | None = None
+        self.generation = 0
+        for key in keys:
+            self.add(key, active=key.private_key is not None)
+
+    def add(self, key: SigningKey, active: bool = False) -> SigningKey:
+        if active and key.private_key is None:
+            raise ValueError("Active key must have private key")
+        self._keys[key.kid] = key
+        if active:
+            self._active = key
+        self._changed()
+        return key
+
+    def remove(self, kid: str) -> None:
+        key = self._keys.pop(kid, None)
+        if key is not None and key is self._active:
+            self._active = None
+        self._changed()
+
+    def _changed(self) -> None:
+        self._jwks = None
+        self.generation += 1
+
+    def get(self, kid: str) -> SigningKey | None:
+        return self._keys.get(kid)
+
+    @property
+    def active(self) -> SigningKey:
+        if self._active is None:
+            raise RuntimeError("KeyRing has no active signing key")
+        return self._active
+
+    @property
+    def jwks(self) -> bytes:
+        """
+        Public keys in JWKS format, serialized once per keyring change
+        """
+        if self._jwks is None:
+            self._render()
+        return self._jwks
+
+    @property
+    def etag(self) -> str:
+        if self._jwks is None:
+            self._render()
+        return self._etag
+
+    def _render(self) -> None:
+        keys = [key.to_jwk() for key in self._keys.values()]
+        self._jwks = json.dumps({"keys": keys}, separators=(",", ":")).encode()
+        self._etag = f'"{hashlib.sha256(self._jwks).hexdigest()[:32]}"'
+
+    def __contains__(self, kid: str) -> bool:
+        return kid in self._keys
+
+    def __len__(self) -> int:
+        return len(self._keys)
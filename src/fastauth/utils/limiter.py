@@ -0,0 +1,60 @@
+from functools import cache
+from http import HTTPStatus
+
+from fastauth.exceptions import FastAuthException, status
+from fastauth.settings import FastAuthSettings
+
+
+class ConcurrencyLimiter:
+    """
+    Fail-fast limiter for CPU heavy steps. When all slots are busy, raise
+    `FastAuthException` with `Retry-After` header instead of queueing the work.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int,
+        retry_after: int = 1,
+        status_code: int = status.HTTP_503_SERVICE_UNAVAILABLE,
+    ):
+        self.max_concurrency = max_concurrency
+        self.retry_after = retry_after
+        self.status_code = status_code
+        self.active = 0
+        self.rejected = 0
+
+    async def __aenter__(self):
+        if self.active >= self.max_concurrency:
+            self.rejected += 1
+            raise FastAuthException(
+                self.status_code,
+                HTTPStatus(self.status_code).phrase,
+                "Server is busy, please try again later.",
+                headers={"Retry-After": str(self.retry_after)},
+            )
+        self.active += 1
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        self.active -= 1
+
+
+@cache
+def _get_limiter(
+    max_concurrency: int, retry_after: int, status_code: int
+) -> ConcurrencyLimiter:
+    return ConcurrencyLimiter(max_concurrency, retry_after, status_code)
+
+
+def get_password_hash_limiter(settings: FastAuthSettings) -> ConcurrencyLimiter | None:
+    """
+    Return process-wide limiter for password hashing, shared by all services
+    created with the same settings values.
+    """
+    if not settings.PASSWORD_HASH_MAX_CONCURRENCY:
+        return None
+    return _get_limiter(
+        settings.PASSWORD_HASH_MAX_CONCURRENCY,
+        settings.PASSWORD_HASH_RETRY_AFTER_SECONDS,
+        settings.PASSWORD_HASH_OVERLOAD_STATUS_CODE,
+    )
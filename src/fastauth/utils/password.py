@@ -1,10 +1,90 @@
+import asyncio
+import hashlib
+import hmac
+import re
 import secrets
-from typing import Protocol
+import time
+from concurrent.futures import Executor
+from contextlib import nullcontext
+from typing import Callable, Protocol, TypeVar
 
+import bcrypt
 from pwdlib import PasswordHash
 from pwdlib.hashers.argon2 import Argon2Hasher
+from pwdlib.hashers.base import HasherProtocol, ensure_bytes, ensure_str
 from pwdlib.hashers.bcrypt import BcryptHasher
 
+from fastauth.settings import FastAuthSettings
+
+_ARGON2_REGEX = re.compile(
+    r"^\$(?P<scheme>argon2(?:id|i|d))\$v=(?P<version>\d+)\$(?P<params>m=\d+,t=\d+,p=\d+)\$"
+)
+_BCRYPT_REGEX = re.compile(r"^\$(?P<prefix>2[abxy])\$(?P<rounds>\d{2})\$")
+_BCRYPT_SALT_LENGTH = 29
+
+
+class WrappedBcryptHasher(HasherProtocol):
+    """
+    Legacy bcrypt hash wrapped by argon2, so it can be upgraded without plain password:
+    `$bcrypt-argon2$<bcrypt salt>$<argon2 hash of bcrypt hash>`.
+    Password is verified by bcrypt with stored salt and then by argon2,
+    on successful login it is always rehashed with current hasher.
+
+    :param argon2: Hasher used to wrap bcrypt hash
+    """
+
+    PREFIX = "$bcrypt-argon2$"
+
+    def __init__(self, argon2: Argon2Hasher | None = None):
+        self.argon2 = argon2 or Argon2Hasher()
+
+    @classmethod
+    def identify(cls, hash: str | bytes) -> bool:
+        return ensure_str(hash).startswith(cls.PREFIX)
+
+    def hash(self, password: str | bytes, *, salt: bytes | None = None) -> str:
+        return self.wrap(BcryptHasher().hash(password, salt=salt))
+
+    def wrap(self, bcrypt_hash: str) -> str:
+        """
+        Wrap existing bcrypt hash
+        """
+        salt = bcrypt_hash[:_BCRYPT_SALT_LENGTH]
+        return f"{self.PREFIX}{salt}${self.argon2.hash(bcrypt_hash)}"
+
+    def verify(self, password: str | bytes, hash: str | bytes) -> bool:
+        body = ensure_str(hash)[len(self.PREFIX) :]
+        salt, inner = body[:_BCRYPT_SALT_LENGTH], body[_BCRYPT_SALT_LENGTH + 1 :]
+        try:
+            bcrypt_hash = bcrypt.hashpw(ensure_bytes(password), salt.encode())
+        except ValueError:
+            return False
+        return self.argon2.verify(bcrypt_hash, inner)
+
+    def check_needs_rehash(self, hash: str | bytes) -> bool:
+        return True
+
+
+def describe_hash(hashed_password: str | None) -> tuple[str, str]:
+    """
+    Scheme and parameters of password hash,
+    e.g. `("argon2id", "v=19,m=65536,t=3,p=4")` or `("bcrypt", "2b,rounds=12")`.
+    """
+    if not hashed_password:
+        return "none", ""
+    if WrappedBcryptHasher.identify(hashed_password):
+        body = hashed_password[len(WrappedBcryptHasher.PREFIX) :]
+        _, bcrypt_params = describe_hash(body[:_BCRYPT_SALT_LENGTH])
+        _, argon2_params = describe_hash(body[_BCRYPT_SALT_LENGTH + 1 :])
+        return "bcrypt-argon2", f"{bcrypt_params};{argon2_params}"
+    match = _ARGON2_REGEX.match(hashed_password)
+    if match is not None:
+        return match["scheme"], f"v={match['version']},{match['params']}"
+    match = _BCRYPT_REGEX.match(hashed_password)
+    if match is not None:
+        return "bcrypt", f"{match['prefix']},rounds={int(match['rounds'])}"
+    return "unknown", ""
+
 
 class IPasswordHelper(Protocol):
     def verify_and_update(
@@ -13,6 +93,24 @@ class IPasswordHelper(Protocol):
 
     def hash(self, password: str) -> str: ...  # pragma: no cover
 
+    def identify(self, hashed_password: str) -> bool: ...  # pragma: no cover
+
+    def needs_rehash(self, hashed_password: str) -> bool: ...  # pragma: no cover
+
+    def generate(self) -> str: ...  # pragma: no cover
+
+
+class IAsyncPasswordHelper(Protocol):
+    async def verify_and_update(
+        self, plain_password: str, hashed_password: str
+    ) -> tuple[bool, str | None]: ...  # pragma: no cover
+
+    async def hash(self, password: str) -> str: ...  # pragma: no cover
+
+    def identify(self, hashed_password: str) -> bool: ...  # pragma: no cover
+
+    def needs_rehash(self, hashed_password: str) -> bool: ...  # pragma: no cover
+
     def generate(self) -> str: ...  # pragma: no cover
 
 
@@ -23,6 +121,7 @@ class PasswordHelper(IPasswordHelper):
                 (
                     Argon2Hasher(),
                     BcryptHasher(),
+                    WrappedBcryptHasher(),
                 )
             )
         else:
@@ -36,5 +135,193 @@ class PasswordHelper(IPasswordHelper):
     def hash(self, password: str) -> str:
         return self.password_hash.hash(password)
 
+    def identify(self, hashed_password: str) -> bool:
+        """
+        Check if value is hash produced by one of supported hashers
+        """
+        return any(
+            hasher.identify(hashed_password) for hasher in self.password_hash.hashers
+        )
+
+    def needs_rehash(self, hashed_password: str) -> bool:
+        """
+        Check if hash is not produced by current hasher with its current parameters
+        """
+        current = self.password_hash.current_hasher
+        return not current.identify(hashed_password) or current.check_needs_rehash(
+            hashed_password
+        )
+
     def generate(self) -> str:
         return secrets.token_urlsafe()
+
+
+# Minimal memory cost of argon2 is 8 KiB per lane
+_ARGON2_MIN_MEMORY_KIB_PER_LANE = 8
+_ARGON2_PARAMS_REGEX = re.compile(r"^(?:v=\d+,)?m=(\d+),t=(\d+),p=(\d+)$")
+# Higher parallelism is chosen only if it is noticeably faster, so noise doesn't flip it
+_ARGON2_PARALLELISM_GAIN = 0.8
+
+
+def _measure_hash(hasher: Argon2Hasher, samples: int) -> float:
+    timings = []
+    for _ in range(samples):
+        started_at = time.perf_counter()
+        hasher.hash("calibration")
+        timings.append(time.perf_counter() - started_at)
+    return min(timings)
+
+
+def _floor_power_of_two(value: int) -> int:
+    return 1 << (max(value, 1).bit_length() - 1)
+
+
+def _argon2_password_hash(
+    time_cost: int, memory_cost: int, parallelism: int
+) -> PasswordHash:
+    return PasswordHash(
+        (
+            Argon2Hasher(time_cost, memory_cost, parallelism),
+            BcryptHasher(),
+            WrappedBcryptHasher(),
+        )
+    )
+
+
+def calibrate_argon2(settings: FastAuthSettings, samples: int = 3) -> PasswordHash:
+    """
+    Benchmark argon2 on current machine and pick strongest parameters which fit budget
+    from settings: `PASSWORD_HASH_TARGET_MS` per hash and `PASSWORD_HASH_MAX_MEMORY_KIB`.
+    Parallelism is benchmarked over powers of two up to `PASSWORD_HASH_MAX_PARALLELISM`,
+    memory cost is the cap rounded down to power of two, halved while single pass
+    is slower than target, then time cost is raised while hash still fits target
+    and rounded down to power of two. Coarse steps make machines of the same type
+    get the same result, but hashes must be verifiable on every node, so calibrate
+    once offline and pin result (`describe_hash` of produced hash) in
+    `PASSWORD_HASH_ARGON2_PARAMS`, then it is used without benchmark.
+
+    Existing hashes with other parameters stay valid and are upgraded on login.
+
+    :param settings: FastAuth settings
+    :param samples: Number of runs per measurement, fastest one is used
+    """
+    if settings.PASSWORD_HASH_ARGON2_PARAMS:
+        match = _ARGON2_PARAMS_REGEX.match(settings.PASSWORD_HASH_ARGON2_PARAMS)
+        if match is None:
+            raise ValueError(
+                f"Invalid PASSWORD_HASH_ARGON2_PARAMS {settings.PASSWORD_HASH_ARGON2_PARAMS!r}, expected m=<KiB>,t=<passes>,p=<lanes>"
+            )
+        memory_cost, time_cost, parallelism = map(int, match.groups())
+        return _argon2_password_hash(time_cost, memory_cost, parallelism)
+
+    target = settings.PASSWORD_HASH_TARGET_MS / 1000
+    max_parallelism = _floor_power_of_two(settings.PASSWORD_HASH_MAX_PARALLELISM)
+    memory_cost = _floor_power_of_two(settings.PASSWORD_HASH_MAX_MEMORY_KIB)
+    memory_cost = max(memory_cost, _ARGON2_MIN_MEMORY_KIB_PER_LANE * max_parallelism)
+
+    parallelism = 1
+    elapsed = _measure_hash(Argon2Hasher(1, memory_cost, parallelism), samples)
+    candidate = 2
+    while candidate <= max_parallelism:
+        candidate_elapsed = _measure_hash(
+            Argon2Hasher(1, memory_cost, candidate), samples
+        )
+        if candidate_elapsed > elapsed * _ARGON2_PARALLELISM_GAIN:
+            break
+        parallelism, elapsed = candidate, candidate_elapsed
+        candidate *= 2
+
+    min_memory = _ARGON2_MIN_MEMORY_KIB_PER_LANE * parallelism
+    while elapsed > target and memory_cost // 2 >= min_memory:
+        memory_cost //= 2
+        elapsed = _measure_hash(Argon2Hasher(1, memory_cost, parallelism), samples)
+
+    # Duration grows linearly with time cost, so estimate it and correct by measurement
+    time_cost = _floor_power_of_two(int(target / elapsed))
+    while time_cost > 1:
+        hasher = Argon2Hasher(time_cost, memory_cost, parallelism)
+        if _measure_hash(hasher, samples) <= target:
+            break
+        time_cost //= 2
+
+    return _argon2_password_hash(time_cost, memory_cost, parallelism)
+
+
+def password_fingerprint(secret: str, hashed_password: str) -> str:
+    """
+    HMAC-SHA256 of stored password hash, changes whenever password changes.
+    """
+    return hmac.new(
+        secret.encode(), hashed_password.encode(), hashlib.sha256
+    ).hexdigest()
+
+
+T = TypeVar("T")
+
+
+def _timed_call(func: Callable[..., T], *args) -> tuple[float, T]:
+    # Module level, so it can be pickled for ProcessPoolExecutor
+    return time.time(), func(*args)
+
+
+class AsyncPasswordHelper(IAsyncPasswordHelper):
+    """
+    Run password hashing outside the event loop.
+
+    :param password_helper: Sync helper that does the actual hashing
+    :param executor: Thread or process pool, loop default executor if None
+    :param max_pending: Max number of hashing jobs submitted to the executor at once,
+        other callers wait for a free slot
+    """
+
+    def __init__(
+        self,
+        password_helper: IPasswordHelper | None = None,
+        executor: Executor | None = None,
+        max_pending: int | None = None,
+    ):
+        self.password_helper = password_helper or PasswordHelper()
+        self.executor = executor
+        self.max_pending = max_pending
+        self._slots = asyncio.Semaphore(max_pending) if max_pending else None
+
+        self.calls = 0
+        self.queue_wait_total = 0.0
+        self.queue_wait_max = 0.0
+
+    @property
+    def queue_wait_avg(self) -> float:
+        return self.queue_wait_total / self.calls if self.calls else 0.0
+
+    async def verify_and_update(
+        self, plain_password: str, hashed_password: str
+    ) -> tuple[bool, str | None]:
+        return await self._run(
+            self.password_helper.verify_and_update, plain_password, hashed_password
+        )
+
+    async def hash(self, password: str) -> str:
+        return await self._run(self.password_helper.hash, password)
+
+    def identify(self, hashed_password: str) -> bool:
+        return self.password_helper.identify(hashed_password)
+
+    def needs_rehash(self, hashed_password: str) -> bool:
+        return self.password_helper.needs_rehash(hashed_password)
+
+    def generate(self) -> str:
+        return self.password_helper.generate()
+
+    async def _run(self, func: Callable[..., T], *args) -> T:
+        loop = asyncio.get_running_loop()
+        submitted_at = time.time()
+        async with self._slots or nullcontext():
+            started_at, result = await loop.run_in_executor(
+                self.executor, _timed_call, func, *args
+            )
+
+        queue_wait = max(started_at - submitted_at, 0.0)
+        self.calls += 1
+        self.queue_wait_total += queue_wait
+        self.queue_wait_max = max(self.queue_wait_max, queue_wait)
+        return result
@@ -0,0 +1,142 @@
+import base64
+from typing import Iterable
+
+from fastauth.utils.cache import TTLCache
+
+WILDCARD = "*"
+
+
+class PermissionIndex:
+    """
+    Compiled set of granted permissions in `resource:action` format.
+    Exact grants are kept in frozenset, wildcard grants (`users:*`, `*:read`, `*:*`)
+    in small resource -> actions trie, so every check is O(1) regardless
+    of number of grants.
+
+    :param permissions: Granted permissions
+    :param roles: Granted roles
+    """
+
+    __slots__ = ("exact", "roles", "_wildcards")
+
+    def __init__(self, permissions: Iterable[str], roles: Iterable[str] = ()):
+        exact = set()
+        wildcards: dict[str, set[str]] = {}
+        for permission in permissions:
+            resource, _, action = permission.partition(":")
+            if WILDCARD in (resource, action):
+                wildcards.setdefault(resource, set()).add(action)
+            else:
+                exact.add(permission)
+        self.exact = frozenset(exact)
+        self.roles = frozenset(roles)
+        self._wildcards = {
+            resource: frozenset(actions) for resource, actions in wildcards.items()
+        }
+
+    def has_permission(self, permission: str) -> bool:
+        if permission in self.exact:
+            return True
+        if not self._wildcards:
+            return False
+
+        resource, _, action = permission.partition(":")
+        for key in (resource, WILDCARD):
+            actions = self._wildcards.get(key)
+            if actions is not None and (WILDCARD in actions or action in actions):
+                return True
+        return False
+
+    def has_any_permission(self, permissions: Iterable[str]) -> bool:
+        return any(self.has_permission(permission) for permission in permissions)
+
+    def has_all_permissions(self, permissions: Iterable[str]) -> bool:
+        return all(self.has_permission(permission) for permission in permissions)
+
+    def has_role(self, role: str) -> bool:
+        return role in self.roles
+
+    def __contains__(self, permission: str) -> bool:
+        return self.has_permission(permission)
+
+    def __repr__(self):
+        return (
+            f"PermissionIndex(exact={len(self.exact)}, "
+            f"wildcards={sum(map(len, self._wildcards.values()))})"
+        )
+
+
+class PermissionRegistry:
+    """
+    Versioned table of known permissions, where every permission has own bit.
+    Used to put permissions into access token as compact base64 bitmask
+    instead of list of strings.
+
+    Registry must be append-only: new permissions are added to the end with
+    bumped `version`, existing ones are never removed or reordered,
+    otherwise already issued tokens would expand to wrong permissions.
+
+    :param permissions: Known permissions in stable order
+    :param version: Registry version, stored in token
+    :param cache_size: Number of decoded bitmasks kept in cache
+    """
+
+    def __init__(
+        self, permissions: Iterable[str], version: int = 1, cache_size: int = 1024
+    ):
+        self.permissions = tuple(dict.fromkeys(permissions))
+        self.version = version
+        self._bits = {permission: i for i, permission in enumerate(self.permissions)}
+        self._cache: TTLCache[str, tuple[str, ...]] = TTLCache(maxsize=cache_size)
+
+    def extend(self, permissions: Iterable[str]) -> "PermissionRegistry":
+        """
+        Return next version of registry with new permissions added to the end.
+        """
+        return PermissionRegistry(
+            [*self.permissions, *permissions], self.version + 1, self._cache.maxsize
+        )
+
+    def encode(self, permissions: Iterable[str]) -> tuple[str, list[str]]:
+        """
+        Encode permissions to bitmask.
+
+        :return: Base64 bitmask and list of permissions unknown to registry
+        """
+        mask = 0
+        unknown = []
+        for permission in permissions:
+            bit = self._bits.get(permission)
+            if bit is None:
+                unknown.append(permission)
+            else:
+                mask |= 1 << bit
+        raw = mask.to_bytes((mask.bit_length() + 7) // 8, "little")
+        return base64.urlsafe_b64encode(raw).rstrip(b"=").decode(), unknown
+
+    def decode(self, mask: str, version: int) -> tuple[str, ...]:
+        """
+        Expand bitmask back to permissions.
+
+        :raise ValueError: If token was issued by newer registry version
+        """
+        if version > self.version:
+            raise ValueError(
+                f"Permission registry version {version} is newer than {self.version}"
+            )
+
+        permissions = self._cache.get(mask)
+        if permissions is None:
+            value = int.from_bytes(
+                base64.urlsafe_b64decode(mask + "=" * (-len(mask) % 4)), "little"
+            )
+            if value.bit_length() > len(self.permissions):
+                raise ValueError("Permission bitmask is out of registry range")
+            permissions = []
+            while value:
+                low = value & -value
+                permissions.append(self.permissions[low.bit_length() - 1])
+                value ^= low
+            permissions = tuple(permissions)
+            self._cache.set(mask, permissions)
+        return permissions
@@ -9,6 +9,8 @@ from fastauth.contrib.sqlalchemy import (
     BaseRolePermissionRel,
     BaseUUIDOAuthAccount,
     OAuthMixin,
+    BaseRevokedTokenModel,
+    TokenVersionMixin,
 )
 from sqlalchemy.orm import DeclarativeBase, Mapped, relationship
 import uuid
@@ -35,7 +37,13 @@ class OAuthAccount(BaseUUIDOAuthAccount, Model):
     )
 
 
-class User(BaseUUIDUserModel, RBACMixin[Role], OAuthMixin[OAuthAccount], Model):
+class User(
+    BaseUUIDUserModel,
+    TokenVersionMixin,
+    RBACMixin[Role],
+    OAuthMixin[OAuthAccount],
+    Model,
+):
     roles: Mapped[list[Role]] = relationship(secondary="user_role_rel", lazy="selectin")
     oauth_accounts: Mapped[list[OAuthAccount]] = relationship(lazy="joined")
 
@@ -48,3 +56,7 @@ class UserRoleRel(BaseUserRoleRel[uuid.UUID, int], Model):
 # Need to create many-to-many between roles and permissions tables
 class RolePermissionRel(BaseRolePermissionRel[int, int], Model):
     pass
+
+
+class RevokedToken(BaseRevokedTokenModel, Model):
+    pass
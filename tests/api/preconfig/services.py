@@ -3,7 +3,11 @@ from typing import Annotated
 
 from fastapi import Depends
 from fastauth.services import BaseAuthService, UUIDMixin
-from fastauth.storage.jwt import JWTTokenStorage
+from fastauth.storage import (
+    InMemoryRevocationBackend,
+    JWTTokenStorage,
+    RevocationList,
+)
 from .models import User
 from .repositories import UserRepoDep, OAuthRepoDep, RoleRepoDep
 from .config import settings
@@ -13,8 +17,11 @@ class AuthService(UUIDMixin, BaseAuthService[User, uuid.UUID]):
     pass
 
 
+revocation = RevocationList(InMemoryRevocationBackend())
+
+
 async def get_token_storage():
-    return JWTTokenStorage(settings)
+    return JWTTokenStorage(settings, revocation=revocation)
 
 
 async def get_auth_service(
@@ -0,0 +1,97 @@
+import time
+import uuid
+import pytest
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from conftest import engine
+from fastauth.contrib.sqlalchemy import SQLAlchemyRevocationBackend
+from fastauth.exceptions import FastAuthException, set_exception_handler
+from fastauth.schemas.auth import TokenType
+from fastauth.storage import InMemoryRevocationBackend, JWTTokenStorage, RevocationList
+from preconfig.config import settings
+from preconfig.models import RevokedToken
+from preconfig.repositories import UserRepository
+from preconfig.services import AuthService
+
+
+class RevocationBackend(SQLAlchemyRevocationBackend):
+    model = RevokedToken
+
+
+@pytest.mark.asyncio
+async def test_verify_token_rejects_revoked_token():
+    storage = JWTTokenStorage(
+        settings, revocation=RevocationList(InMemoryRevocationBackend())
+    )
+    async with async_sessionmaker(engine, expire_on_commit=False)() as session:
+        service = AuthService(settings, UserRepository(session), storage)
+        user = await service.user_repo.create(
+            {"id": uuid.uuid4(), "email": "revoked@example.com", "hashed_password": ""}
+        )
+        tokens = await service.create_tokens(user)
+        other = await service.create_tokens(user)
+
+        payload = await service.verify_token(tokens.access_token, TokenType.ACCESS)
+        await service.logout(user, payload)
+
+        for token, token_type in [
+            (tokens.access_token, TokenType.ACCESS),
+            (tokens.refresh_token, TokenType.REFRESH),
+        ]:
+            with pytest.raises(FastAuthException, match="Token was revoked"):
+                await service.verify_token(token, token_type)
+        # Other sessions are not affected
+        await service.verify_token(other.refresh_token, TokenType.REFRESH)
+
+
+@pytest.mark.asyncio
+async def test_logout_route_revokes_session(client, test_app):
+    set_exception_handler(test_app)
+    credentials = {
+        "email": "logout@example.com",
+        "password": "test",
+        "is_active": True,
+        "is_verified": True,
+    }
+    response = await client.post("/api/auth/signup", json=credentials)
+    assert response.status_code == 200
+
+    response = await client.post(
+        "/api/auth/login",
+        data={"username": credentials["email"], "password": "test"},
+    )
+    tokens = response.json()
+    access = {"Authorization": f"Bearer {tokens['access_token']}"}
+    refresh = {"Authorization": f"Bearer {tokens['refresh_token']}"}
+
+    response = await client.post("/api/auth/refresh", headers=refresh)
+    assert response.status_code == 200
+    # Session is kept on refresh, so logout by new access token revokes old refresh token
+    access = {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+    response = await client.post("/api/auth/logout", headers=access)
+    assert response.status_code == 204
+
+    assert (await client.post("/api/auth/refresh", headers=refresh)).status_code == 401
+    assert (await client.post("/api/auth/logout", headers=access)).status_code == 401
+
+
+@pytest.mark.asyncio
+async def test_sqlalchemy_revocation_backend():
+    backend = RevocationBackend(async_sessionmaker(engine, expire_on_commit=False))
+    now = time.time()
+    await backend.revoke("active", now + 60)
+    await backend.revoke("expired", now - 1)
+    await backend.revoke("forever")
+
+    assert await backend.is_revoked("active")
+    assert await backend.is_revoked("forever")
+    assert not await backend.is_revoked("expired")
+    assert not await backend.is_revoked("unknown")
+
+    assert await backend.get_revoked() == {"active": now + 60, "forever": None}
+    assert await backend.get_revoked(since=time.time() + 1) == {}
+
+    await backend.purge_expired()
+    revocation = RevocationList(backend)
+    assert await revocation.is_revoked("active")
+    assert len(revocation) == 2
@@ -0,0 +1,99 @@
+import uuid
+import pytest
+from pwdlib.hashers.argon2 import Argon2Hasher
+from pwdlib.hashers.bcrypt import BcryptHasher
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from conftest import engine
+from fastauth.services import PasswordMigrationJob
+from fastauth.utils.password import PasswordHelper, WrappedBcryptHasher
+from preconfig.models import User
+from preconfig.repositories import UserRepository
+
+
+@pytest.mark.asyncio
+async def test_password_migration_wraps_bcrypt_hashes(tmp_path):
+    session_factory = async_sessionmaker(engine, expire_on_commit=False)
+    password_helper = PasswordHelper()
+    async with session_factory() as session:
+        repo = UserRepository(session)
+        await repo.create_many(
+            [
+                {
+                    "id": uuid.uuid4(),
+                    "email": f"dormant{i}@example.com",
+                    "hashed_password": BcryptHasher(rounds=4).hash("legacy"),
+                }
+                for i in range(3)
+            ]
+        )
+        await repo.create(
+            {
+                "id": uuid.uuid4(),
+                "email": "active@example.com",
+                "hashed_password": password_helper.hash("test"),
+            }
+        )
+        await repo.commit()
+
+        job = PasswordMigrationJob(
+            repo,
+            password_helper,
+            wrapper=WrappedBcryptHasher(Argon2Hasher(time_cost=1, memory_cost=1024)),
+            batch_size=2,
+            checkpoint_path=tmp_path / "checkpoint.json",
+            parse_cursor=uuid.UUID,
+        )
+        report = await job.run()
+        assert report.schemes["bcrypt"] == {"2b,rounds=4": 3}
+        assert sum(report.schemes["argon2id"].values()) >= 1
+        assert report.outdated == report.wrapped == 3
+
+        # Resumed from checkpoint, nothing left to process
+        resumed = await job.run()
+        assert resumed.model_dump(mode="json") == report.model_dump(mode="json")
+
+    async with session_factory() as session:
+        users = await session.scalars(select(User).where(User.email.like("dormant%")))
+        for user in users.unique():
+            assert user.hashed_password.startswith(WrappedBcryptHasher.PREFIX)
+            valid, updated = password_helper.verify_and_update(
+                "legacy", user.hashed_password
+            )
+            assert valid and updated.startswith("$argon2id$")
+
+
+@pytest.mark.asyncio
+async def test_password_migration_unit_of_work(tmp_path):
+    session_factory = async_sessionmaker(engine, expire_on_commit=False)
+    async with session_factory() as session:
+        repo = UserRepository(session, auto_commit=False)
+        await repo.create_many(
+            [
+                {
+                    "id": uuid.uuid4(),
+                    "email": f"uow-dormant{i}@example.com",
+                    "hashed_password": BcryptHasher(rounds=4).hash("legacy"),
+                }
+                for i in range(3)
+            ]
+        )
+        await repo.commit()
+
+        job = PasswordMigrationJob(
+            repo,
+            wrapper=WrappedBcryptHasher(Argon2Hasher(time_cost=1, memory_cost=1024)),
+            batch_size=2,
+            checkpoint_path=tmp_path / "checkpoint.json",
+            parse_cursor=uuid.UUID,
+        )
+        report = await job.run()
+        assert report.wrapped >= 3
+        # Session is closed without commit, as if job was interrupted here
+
+    async with session_factory() as session:
+        users = await session.scalars(
+            select(User).where(User.email.like("uow-dormant%"))
+        )
+        for user in users.unique():
+            assert user.hashed_password.startswith(WrappedBcryptHasher.PREFIX)
@@ -0,0 +1,108 @@
+import uuid
+import pytest
+from pwdlib.hashers.bcrypt import BcryptHasher
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from conftest import engine
+from fastauth.exceptions import FastAuthException
+from fastauth.services import RehashQueue
+from fastauth.settings import FastAuthSettings
+from fastauth.storage import JWTTokenStorage
+from preconfig.repositories import UserRepository
+from preconfig.services import AuthService
+
+
+async def create_service(session, settings):
+    service = AuthService(settings, UserRepository(session), JWTTokenStorage(settings))
+    user = await service.user_repo.create(
+        {
+            "id": uuid.uuid4(),
+            "email": f"reset-{uuid.uuid4()}@example.com",
+            "hashed_password": await service._hash_password("old"),
+        }
+    )
+    return service, user
+
+
+@pytest.mark.asyncio
+async def test_reset_password_hmac_fingerprint():
+    settings = FastAuthSettings(SECRET_KEY="secret", RESET_TOKEN_FINGERPRINT="hmac")
+    async with async_sessionmaker(engine, expire_on_commit=False)() as session:
+        service, user = await create_service(session, settings)
+        token = await service.request_forgot_password(user.email)
+
+        user = await service.reset_user_password(token, "new")
+        valid, _ = await service._verify_and_update_password(
+            "new", user.hashed_password
+        )
+        assert valid
+
+        # Token is bound to previous password hash, so it can't be reused
+        with pytest.raises(FastAuthException, match="Invalid reset token"):
+            await service.reset_user_password(token, "other")
+
+
+@pytest.mark.asyncio
+async def test_reset_password_hash_fingerprint_still_accepted():
+    hash_settings = FastAuthSettings(
+        SECRET_KEY="secret", RESET_TOKEN_FINGERPRINT="hash"
+    )
+    async with async_sessionmaker(engine, expire_on_commit=False)() as session:
+        service, user = await create_service(session, hash_settings)
+        # Token issued before switch to default "hmac" mode
+        token = await service.request_forgot_password(user.email)
+        first_token = await service.request_forgot_password(user.email)
+
+        service.settings = FastAuthSettings(
+            SECRET_KEY="secret", RESET_TOKEN_FINGERPRINT="hmac"
+        )
+        await service.reset_user_password(token, "new")
+
+        with pytest.raises(FastAuthException, match="Invalid reset token"):
+            await service.reset_user_password(first_token, "other")
+
+
+@pytest.mark.asyncio
+async def test_reset_password_after_deferred_rehash():
+    settings = FastAuthSettings(SECRET_KEY="secret")
+    session_factory = async_sessionmaker(engine, expire_on_commit=False)
+    batches = []
+
+    async def writer(hashes):
+        batches.append(hashes)
+
+    rehash_queue = RehashQueue(writer, flush_interval=10)
+    async with session_factory() as session:
+        repo = UserRepository(session)
+        service = AuthService(
+            settings, repo, JWTTokenStorage(settings), rehash_queue=rehash_queue
+        )
+        user = await repo.create(
+            {
+                "id": uuid.uuid4(),
+                "email": "rehash-reset@example.com",
+                "hashed_password": BcryptHasher(rounds=4).hash("old"),
+                "is_active": True,
+                "is_verified": True,
+            }
+        )
+        # Outdated bcrypt hash is queued for upgrade
+        await service.login(user.email, "old")
+        assert len(rehash_queue) == 1
+        pending = dict(rehash_queue._pending)
+
+        token = await service.request_forgot_password(user.email)
+        await service.reset_user_password(token, "new")
+        assert len(rehash_queue) == 0
+
+        # Batch taken by writer before reset doesn't overwrite new password
+        await repo.update_hashed_passwords(pending)
+
+    async with session_factory() as session:
+        user = await UserRepository(session).get_by_pk(user.id)
+        valid, _ = await service._verify_and_update_password(
+            "new", user.hashed_password
+        )
+        assert valid
+
+    await rehash_queue.close()
+    assert batches == []
@@ -0,0 +1,51 @@
+import pytest
+from pwdlib.hashers.bcrypt import BcryptHasher
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from conftest import engine
+from fastauth.exceptions import FastAuthException, UserAlreadyExists
+from fastauth.storage import JWTTokenStorage
+from preconfig.config import settings
+from preconfig.models import User
+from preconfig.repositories import RoleRepository, UserRepository
+from preconfig.services import AuthService
+
+
+@pytest.mark.asyncio
+async def test_signup_many():
+    session_factory = async_sessionmaker(engine, expire_on_commit=False)
+    bcrypt_hash = BcryptHasher().hash("legacy")
+    payloads = [
+        {"email": f"bulk{i}@example.com", "password": "test", "roles": ["USER"]}
+        for i in range(5)
+    ]
+    payloads.append({"email": "legacy@example.com", "hashed_password": bcrypt_hash})
+
+    async with session_factory() as session:
+        service = AuthService(
+            settings,
+            UserRepository(session),
+            JWTTokenStorage(settings),
+            role_repo=RoleRepository(session),
+        )
+        assert await service.signup_many(payloads, batch_size=4) == 6
+
+        with pytest.raises(UserAlreadyExists):
+            await service.signup_many(payloads[:1])
+        with pytest.raises(FastAuthException, match="Invalid password hash"):
+            await service.signup_many(
+                [{"email": "plain@example.com", "hashed_password": "legacy"}]
+            )
+
+    async with session_factory() as session:
+        result = await session.scalars(select(User).where(User.email.like("bulk%")))
+        users = result.unique().all()
+        assert len(users) == 5
+        assert all(u.hashed_password.startswith("$argon2") for u in users)
+        assert all([r.name for r in u.roles] == ["USER"] for u in users)
+
+        legacy = await session.scalar(
+            select(User).where(User.email == "legacy@example.com")
+        )
+        assert legacy.hashed_password == bcrypt_hash
+        assert legacy.roles == []
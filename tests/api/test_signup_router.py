@@ -1,8 +1,7 @@
 from preconfig.schema import UserCreate, UserRead
 from preconfig.config import settings
 
-from fastauth.routes import get_signup_router
-from preconfig.security import security
+from fastauth.exceptions import set_exception_handler
 import pytest
 from unittest.mock import patch
 
@@ -25,6 +24,25 @@ async def test_user_safe_signup(client):
     assert user.is_verified == settings.DEFAULT_USER_IS_VERIFIED
 
 
+@pytest.mark.asyncio
+@pytest.mark.parametrize("optimistic", [False, True])
+async def test_user_signup_already_exists(client, test_app, optimistic):
+    set_exception_handler(test_app)
+    payload = UserCreate(
+        email=f"exists-{optimistic}@example.com",
+        password="test",
+        is_active=True,
+        is_verified=True,
+    )
+    with patch.object(settings, "USER_UNIQUE_CHECK_OPTIMISTIC", optimistic):
+        response = await client.post("/api/auth/signup", json=payload.model_dump())
+        assert response.status_code == 200
+
+        response = await client.post("/api/auth/signup", json=payload.model_dump())
+        assert response.status_code == 400
+        assert response.json()["title"] == "User already exists."
+
+
 # @pytest.mark.asyncio
 # async def test_user_unsafe_signup(client):
 
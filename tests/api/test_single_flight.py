@@ -0,0 +1,56 @@
+import asyncio
+import uuid
+import pytest
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from conftest import engine
+from fastauth.repositories import SingleFlightUserMixin
+from fastauth.storage import JWTTokenStorage, UserSnapshot
+from fastauth.utils.singleflight import SingleFlight
+from preconfig.config import settings
+from preconfig.models import User
+from preconfig.repositories import UserRepository
+from preconfig.services import AuthService
+
+
+class SingleFlightUserRepository(SingleFlightUserMixin, UserRepository):
+    single_flight = SingleFlight()
+
+
+@pytest.mark.asyncio
+async def test_single_flight_sqlalchemy_repository():
+    session_factory = async_sessionmaker(engine, expire_on_commit=False)
+    async with session_factory() as session:
+        user = await UserRepository(session).create(
+            {"id": uuid.uuid4(), "email": "flight@example.com", "hashed_password": ""}
+        )
+
+    statements = []
+
+    def before_execute(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    async with session_factory() as first, session_factory() as second:
+        repos = [SingleFlightUserRepository(first), SingleFlightUserRepository(second)]
+        event.listen(engine.sync_engine, "before_cursor_execute", before_execute)
+        try:
+            users = await asyncio.gather(*(repo.get_by_pk(user.id) for repo in repos))
+        finally:
+            event.remove(engine.sync_engine, "before_cursor_execute", before_execute)
+
+        assert len([s for s in statements if s.startswith("SELECT users")]) == 1
+        assert SingleFlightUserRepository.single_flight.coalesced == 1
+        owner, snapshot = users
+        assert isinstance(owner, User)
+        assert isinstance(snapshot, UserSnapshot)
+        assert snapshot.email == owner.email
+
+        # Snapshot is reloaded in own session of request before update
+        service = AuthService(settings, repos[1], JWTTokenStorage(settings))
+        updated = await service.update_user(snapshot, {"email": "flown@example.com"})
+        assert isinstance(updated, User)
+        assert updated in second
+
+    async with session_factory() as session:
+        user = await UserRepository(session).get_by_pk(user.id)
+        assert user.email == "flown@example.com"
@@ -0,0 +1,140 @@
+import uuid
+from unittest.mock import patch
+import pytest
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from conftest import engine
+from fastauth.exceptions import FastAuthException, set_exception_handler
+from fastauth.schemas.auth import TokenType
+from fastauth.settings import FastAuthSettings
+from fastauth.storage import InMemoryUserCache, JWTTokenStorage
+from preconfig.models import User
+from preconfig.repositories import UserRepository
+from preconfig.services import AuthService
+
+
+async def create_user(service, password="test"):
+    return await service.user_repo.create(
+        {
+            "id": uuid.uuid4(),
+            "email": f"version-{uuid.uuid4()}@example.com",
+            "hashed_password": await service._hash_password(password),
+        }
+    )
+
+
+@pytest.mark.asyncio
+async def test_logout_all_bumps_token_version():
+    settings = FastAuthSettings(SECRET_KEY="secret")
+    async with async_sessionmaker(engine, expire_on_commit=False)() as session:
+        service = AuthService(
+            settings, UserRepository(session), JWTTokenStorage(settings)
+        )
+        user = await create_user(service)
+        tokens = await service.create_tokens(user)
+
+        payload = await service.verify_token(tokens.access_token, TokenType.ACCESS)
+        assert payload.token_version == 0
+
+        # Version is served from process-wide cache, without DB query
+        other_service = AuthService(
+            settings, UserRepository(session), JWTTokenStorage(settings)
+        )
+        assert other_service.token_version_cache is service.token_version_cache
+        with patch.object(UserRepository, "get_by_pk", side_effect=AssertionError):
+            await other_service.verify_token(tokens.access_token, TokenType.ACCESS)
+
+        user = await service.logout_all(user)
+        assert user.token_version == 1
+        assert service.token_version_cache.get(str(user.id)) == 1
+
+        for token, token_type in [
+            (tokens.access_token, TokenType.ACCESS),
+            (tokens.refresh_token, TokenType.REFRESH),
+        ]:
+            with pytest.raises(FastAuthException, match="Token was revoked"):
+                await other_service.verify_token(token, token_type)
+
+        new_tokens = await service.create_tokens(user)
+        payload = await service.verify_token(new_tokens.access_token, TokenType.ACCESS)
+        assert payload.token_version == 1
+
+
+@pytest.mark.asyncio
+async def test_reset_password_invalidates_tokens():
+    settings = FastAuthSettings(SECRET_KEY="secret")
+    async with async_sessionmaker(engine, expire_on_commit=False)() as session:
+        service = AuthService(
+            settings, UserRepository(session), JWTTokenStorage(settings)
+        )
+        user = await create_user(service)
+        tokens = await service.create_tokens(user)
+        await service.verify_token(tokens.access_token, TokenType.ACCESS)
+
+        reset_token = await service.request_forgot_password(user.email)
+        user = await service.reset_user_password(reset_token, "new")
+        assert user.token_version == 1
+
+        with pytest.raises(FastAuthException, match="Token was revoked"):
+            await service.verify_token(tokens.access_token, TokenType.ACCESS)
+
+
+@pytest.mark.asyncio
+async def test_logout_all_route(client, test_app):
+    set_exception_handler(test_app)
+    email = "logout-all@example.com"
+    response = await client.post(
+        "/api/auth/signup",
+        json={
+            "email": email,
+            "password": "test",
+            "is_active": True,
+            "is_verified": True,
+        },
+    )
+    assert response.status_code == 200
+
+    headers = []
+    for _ in range(2):
+        response = await client.post(
+            "/api/auth/login", data={"username": email, "password": "test"}
+        )
+        headers.append({"Authorization": f"Bearer {response.json()['access_token']}"})
+
+    response = await client.post("/api/auth/logout-all", headers=headers[0])
+    assert response.status_code == 204
+    for header in headers:
+        response = await client.post("/api/auth/logout", headers=header)
+        assert response.status_code == 401
+
+
+@pytest.mark.asyncio
+async def test_logout_all_with_stale_cached_user():
+    settings = FastAuthSettings(SECRET_KEY="secret")
+    user_cache = InMemoryUserCache()
+    async with async_sessionmaker(engine, expire_on_commit=False)() as session:
+        service = AuthService(
+            settings,
+            UserRepository(session),
+            JWTTokenStorage(settings),
+            user_cache=user_cache,
+        )
+        user = await create_user(service)
+        await user_cache.set(user.id, user)
+        stale = await service.get_user(user.id)
+        assert stale.token_version == 0
+
+    # Another worker bumps version, cached snapshot is not updated
+    async with async_sessionmaker(engine, expire_on_commit=False)() as session:
+        other_service = AuthService(
+            settings, UserRepository(session), JWTTokenStorage(settings)
+        )
+        await other_service.logout_all(await other_service.get_user(user.id))
+        tokens = await other_service.create_tokens(await session.get(User, user.id))
+    assert (await user_cache.get(user.id)).token_version == 0
+
+    async with async_sessionmaker(engine, expire_on_commit=False)() as session:
+        service.user_repo = UserRepository(session)
+        await service.logout_all(stale)
+        with pytest.raises(FastAuthException, match="Token was revoked"):
+            await service.verify_token(tokens.access_token, TokenType.ACCESS)
+        assert await service.user_cache.get(user.id) is None
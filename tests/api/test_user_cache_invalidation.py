@@ -0,0 +1,60 @@
+import uuid
+import pytest
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from conftest import engine
+from fastauth.exceptions import FastAuthException
+from fastauth.schemas.auth import TokenData, TokenType
+from fastauth.settings import FastAuthSettings
+from fastauth.storage import InMemoryUserCache, JWTTokenStorage
+from preconfig.repositories import UserRepository
+from preconfig.schema import UserUpdate
+from preconfig.services import AuthService
+
+
+@pytest.mark.asyncio
+async def test_service_writes_invalidate_user_cache():
+    settings = FastAuthSettings(SECRET_KEY="secret", DEBUG=False)
+    user_cache = InMemoryUserCache()
+    async with async_sessionmaker(engine, expire_on_commit=False)() as session:
+        service = AuthService(
+            settings,
+            UserRepository(session),
+            JWTTokenStorage(settings),
+            user_cache=user_cache,
+        )
+        user = await service.user_repo.create(
+            {
+                "id": uuid.uuid4(),
+                "email": "cached@example.com",
+                "hashed_password": await service._hash_password("old"),
+                "is_active": True,
+                "is_verified": False,
+            }
+        )
+        payload = TokenData(
+            user_id=str(user.id), email=user.email, token_type=TokenType.ACCESS
+        )
+
+        # Unverified user is cached by first authentication
+        with pytest.raises(FastAuthException, match="User not found"):
+            await service.authenticate(payload)
+        assert await user_cache.get(user.id) is not None
+
+        token = await service.request_verification(user.email)
+        await service.user_verification(token)
+        current = await service.authenticate(payload)
+        assert current.is_verified
+
+        await service.patch_user(current, UserUpdate(email="renamed@example.com"))
+        current = await service.authenticate(payload)
+        assert current.email == "renamed@example.com"
+
+        old_hash = current.hashed_password
+        token = await service.request_forgot_password(current.email)
+        await service.reset_user_password(token, "new")
+        current = await service.authenticate(payload)
+        assert current.hashed_password != old_hash
+
+        await service.delete_user(current)
+        with pytest.raises(FastAuthException, match="User not found"):
+            await service.authenticate(payload)
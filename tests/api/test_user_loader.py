@@ -0,0 +1,82 @@
+import asyncio
+from contextlib import asynccontextmanager
+import uuid
+import pytest
+from conftest import session_factory
+from fastauth.contrib.sqlalchemy import SQLAlchemyUserLoader
+from preconfig.models import User
+from preconfig.repositories import UserRepository
+
+
+@pytest.mark.asyncio
+async def test_user_loader_batches_queries():
+    ids = [uuid.uuid4() for _ in range(3)]
+    async with session_factory() as session:
+        session.add_all(
+            User(id=pk, email=f"loader{i}@example.com", hashed_password="hash")
+            for i, pk in enumerate(ids)
+        )
+        await session.commit()
+
+    loader = SQLAlchemyUserLoader(session_factory, User)
+    loaded = await asyncio.gather(*(loader.load(pk) for pk in [*ids, *ids]))
+    missing = await loader.load(uuid.uuid4())
+
+    assert [user.id for user in loaded] == [*ids, *ids]
+    assert loaded[0].roles == []
+    assert missing is None
+    assert loader.loads == 7
+    assert loader.batches == 2
+
+
+@pytest.mark.asyncio
+async def test_user_loader_copy_per_session():
+    pk = uuid.uuid4()
+    async with session_factory() as session:
+        session.add(User(id=pk, email="loader-copy@example.com", hashed_password="a"))
+        await session.commit()
+
+    loader = SQLAlchemyUserLoader(session_factory, User)
+    async with session_factory() as first, session_factory() as second:
+        repos = [
+            UserRepository(first, loader=loader, auto_commit=False),
+            UserRepository(second, loader=loader, auto_commit=False),
+        ]
+        users = await asyncio.gather(*(repo.get_by_pk(pk) for repo in repos))
+        assert loader.batches == 1
+        assert users[0] is not users[1]
+        assert users[0] in first and users[1] in second
+
+        # Update of one copy doesn't leak into another request
+        await repos[0].update(users[0], {"hashed_password": "b"})
+        assert users[1].hashed_password == "a"
+
+        # Read after write in the same transaction bypasses loader
+        user = await repos[0].get_by_pk(pk)
+        assert user.hashed_password == "b"
+        assert loader.batches == 1
+
+        await repos[0].commit()
+        await repos[0].get_by_pk(pk)
+        assert loader.batches == 2
+
+
+@pytest.mark.asyncio
+async def test_user_loader_cancelled_batch():
+    @asynccontextmanager
+    async def hanging_session():
+        await asyncio.Event().wait()
+        yield
+
+    loader = SQLAlchemyUserLoader(hanging_session, User)
+    calls = [asyncio.create_task(loader.load(uuid.uuid4())) for _ in range(2)]
+    for _ in range(3):
+        await asyncio.sleep(0)
+    assert len(loader._tasks) == 1
+    for task in loader._tasks:
+        task.cancel()
+
+    # Callers are released, not left waiting for the batch
+    for call in calls:
+        with pytest.raises(asyncio.CancelledError):
+            await asyncio.wait_for(call, 1)
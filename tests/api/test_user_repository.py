@@ -0,0 +1,159 @@
+import uuid
+import pytest
+from sqlalchemy import event, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from conftest import engine
+from fastauth.exceptions import UserAlreadyExists
+from fastauth.repositories import LoadStrategy
+from fastauth.schemas.auth import TokenData, TokenType
+from fastauth.settings import FastAuthSettings
+from fastauth.storage import JWTTokenStorage
+from preconfig.models import Role, User
+from preconfig.repositories import UserRepository
+from preconfig.services import AuthService
+
+
+@pytest.mark.asyncio
+async def test_user_repository_unit_of_work_update():
+    session_factory = async_sessionmaker(engine, expire_on_commit=False)
+    async with session_factory() as session:
+        repo = UserRepository(session, auto_commit=False)
+        user = await repo.create(
+            {"id": uuid.uuid4(), "email": "uow@example.com", "hashed_password": "old"}
+        )
+        await repo.commit()
+
+        statements = []
+
+        def before_execute(conn, cursor, statement, *args):
+            statements.append(statement)
+
+        event.listen(engine.sync_engine, "before_cursor_execute", before_execute)
+        try:
+            user = await repo.update(user, {"hashed_password": "new"})
+            await repo.commit()
+        finally:
+            event.remove(engine.sync_engine, "before_cursor_execute", before_execute)
+
+    assert user.hashed_password == "new"
+    assert len(statements) == 1
+    assert statements[0].startswith("UPDATE users")
+    assert "RETURNING" in statements[0]
+
+    async with session_factory() as session:
+        stored = await session.get(User, user.id)
+        assert stored.hashed_password == "new"
+
+
+@pytest.mark.asyncio
+async def test_user_repository_load_strategy():
+    session_factory = async_sessionmaker(engine, expire_on_commit=False)
+    async with session_factory() as session:
+        role = await session.scalar(select(Role).limit(1))
+        user = User(
+            id=uuid.uuid4(),
+            email="load@example.com",
+            hashed_password="hash",
+            roles=[role],
+        )
+        session.add(user)
+        await session.commit()
+        user_id = user.id
+
+    statements = []
+
+    def before_execute(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(engine.sync_engine, "before_cursor_execute", before_execute)
+    try:
+        async with session_factory() as session:
+            repo = UserRepository(session)
+            user = await repo.get_by_pk(user_id, load=LoadStrategy.AUTHENTICATE)
+            assert len(statements) == 1
+            assert "roles" not in vars(user)
+
+            user = await repo.get_by_login_fields(
+                ["email"], "load@example.com", load=LoadStrategy.TOKENS
+            )
+            assert [r.name for r in user.roles] == [role.name]
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", before_execute)
+
+
+@pytest.mark.asyncio
+async def test_authenticate_loads_roles():
+    settings = FastAuthSettings(SECRET_KEY="secret")
+    session_factory = async_sessionmaker(engine, expire_on_commit=False)
+    async with session_factory() as session:
+        role = await session.scalar(select(Role).limit(1))
+        user = User(
+            id=uuid.uuid4(),
+            email="current@example.com",
+            hashed_password="hash",
+            is_active=True,
+            is_verified=True,
+            roles=[role],
+        )
+        session.add(user)
+        await session.commit()
+        user_id = user.id
+
+    async with session_factory() as session:
+        service = AuthService(
+            settings, UserRepository(session), JWTTokenStorage(settings)
+        )
+        payload = TokenData(
+            user_id=str(user_id), email=user.email, token_type=TokenType.ACCESS
+        )
+        user = await service.authenticate(payload)
+        # Roles are available to endpoints and role checks, OAuth accounts are skipped
+        assert [r.name for r in user.roles] == [role.name]
+        assert "oauth_accounts" not in vars(user)
+
+
+@pytest.mark.asyncio
+async def test_user_repository_keyset_pagination():
+    session_factory = async_sessionmaker(engine, expire_on_commit=False)
+    async with session_factory() as session:
+        session.add_all(
+            User(id=uuid.uuid4(), email=f"page{i}@example.com", hashed_password="page")
+            for i in range(5)
+        )
+        await session.commit()
+
+    async with session_factory() as session:
+        repo = UserRepository(session)
+        first = await repo.get_many(limit=2, order_by="email", hashed_password="page")
+        second = await repo.get_many(
+            limit=2,
+            after=repo.get_cursor(first[-1], "email"),
+            order_by="email",
+            hashed_password="page",
+        )
+        assert [u.email for u in first + second] == [
+            f"page{i}@example.com" for i in range(4)
+        ]
+
+        streamed = [
+            user.email
+            async for user in repo.stream_many(chunk_size=2, hashed_password="page")
+        ]
+        assert sorted(streamed) == [f"page{i}@example.com" for i in range(5)]
+
+
+@pytest.mark.asyncio
+async def test_user_repository_integrity_errors():
+    session_factory = async_sessionmaker(engine, expire_on_commit=False)
+    async with session_factory() as session:
+        repo = UserRepository(session)
+        payload = {"email": "integrity@example.com", "hashed_password": "hash"}
+        await repo.create({"id": uuid.uuid4(), **payload})
+        with pytest.raises(UserAlreadyExists):
+            await repo.create({"id": uuid.uuid4(), **payload})
+
+        # Other constraint failures are not reported as duplicate user
+        with pytest.raises(IntegrityError) as e:
+            await repo.create({"id": uuid.uuid4(), "hashed_password": "hash"})
+        assert not isinstance(e.value, UserAlreadyExists)
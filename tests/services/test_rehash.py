@@ -0,0 +1,64 @@
+import asyncio
+import pytest
+from fastauth.services import RehashQueue
+
+
+@pytest.mark.asyncio
+async def test_rehash_queue_batches_writes():
+    batches = []
+
+    async def writer(hashes):
+        batches.append(hashes)
+
+    queue = RehashQueue(writer, batch_size=2, flush_interval=10)
+    queue.submit(1, "old-1", "hash-1")
+    queue.submit(1, "old-1", "hash-1-new")
+    assert len(queue) == 1
+
+    queue.submit(2, "old-2", "hash-2")
+    for _ in range(10):
+        await asyncio.sleep(0)
+    assert batches == [{1: ("old-1", "hash-1-new"), 2: ("old-2", "hash-2")}]
+
+    queue.submit(3, "old-3", "hash-3")
+    await queue.close()
+    assert batches[-1] == {3: ("old-3", "hash-3")}
+    assert queue.written == 3
+
+
+@pytest.mark.asyncio
+async def test_rehash_queue_retries_failed_batch():
+    calls = 0
+
+    async def writer(hashes):
+        nonlocal calls
+        calls += 1
+        if calls < 3:
+            raise ConnectionError("db is down")
+
+    queue = RehashQueue(writer, max_retries=2, retry_delay=0)
+    queue.submit(1, "old", "hash")
+    await queue.flush()
+    assert calls == 3
+    assert queue.written == 1
+
+    queue = RehashQueue(writer, max_retries=0, retry_delay=0)
+    calls = -10
+    queue.submit(1, "old", "hash")
+    await queue.flush()
+    assert queue.failed == 1
+    assert isinstance(queue.last_error, ConnectionError)
+
+
+@pytest.mark.asyncio
+async def test_rehash_queue_discard():
+    batches = []
+
+    async def writer(hashes):
+        batches.append(hashes)
+
+    queue = RehashQueue(writer, flush_interval=10)
+    queue.submit(1, "old", "hash")
+    queue.discard(1)
+    await queue.close()
+    assert batches == []
@@ -1,5 +1,12 @@
-from fastauth.schemas.auth import TokenData, TokenType
+import time
+from unittest.mock import patch
+from fastauth.exceptions import FastAuthException
+from fastapi.encoders import jsonable_encoder
+from fastauth.schemas.auth import TokenClaims, TokenData, TokenType
 from fastauth.storage import JWTTokenStorage
+from fastauth.utils.cache import TTLCache
+from fastauth.utils.keyring import KeyRing, SigningKey
+from fastauth.utils.permissions import PermissionRegistry
 import pytest
 
 
@@ -36,3 +43,121 @@ def test_decode_token(mock_storage, token_data):
     assert decoded_token.expires_in is None  # 3600
     assert decoded_token.jti == "jti"
     assert decoded_token.token_type == TokenType.ACCESS
+
+
+def test_decode_token_cache(mock_settings, token_data):
+    cache = TTLCache(maxsize=10, ttl=60)
+    storage = JWTTokenStorage(mock_settings, cache=cache)
+    token = storage.encode_token(token_data)
+
+    first = storage.decode_token(token)
+    second = storage.decode_token(token)
+    assert first is second
+    assert cache.misses == 1
+    assert cache.hits == 1
+
+    with pytest.raises(FastAuthException, match=r"400"):
+        storage.decode_token(token + "x")
+    assert len(cache) == 1
+
+
+def test_ttl_cache_expiration():
+    cache = TTLCache(maxsize=2)
+    cache.set("expired", 1, expires_at=time.time() - 1)
+    assert cache.get("expired") is None
+    assert "expired" not in cache
+
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+    assert "b" not in cache
+    assert cache.get("a") == 1
+
+
+def test_decode_access_token_claims(mock_storage, token_data):
+    token = mock_storage.encode_token(token_data)
+    decoded_token = mock_storage.decode_token(token)
+    assert isinstance(decoded_token, TokenClaims)
+    assert jsonable_encoder(decoded_token)["user_id"] == "test"
+
+    refresh_data = token_data.model_copy(update={"token_type": TokenType.REFRESH})
+    token = mock_storage.encode_token(refresh_data)
+    decoded_token = mock_storage.decode_token(token)
+    assert isinstance(decoded_token, TokenData)
+    assert decoded_token.token_type == TokenType.REFRESH
+
+
+def test_bitmask_permissions(mock_settings, token_data):
+    settings = mock_settings.model_copy(
+        update={"ACCESS_TOKEN_PERMISSIONS_FORMAT": "bitmask"}
+    )
+    registry = PermissionRegistry([f"resource{i}:read" for i in range(200)])
+    storage = JWTTokenStorage(settings, permission_registry=registry)
+    token_data.permissions = [*registry.permissions, "custom:*"]
+
+    token = storage.encode_token(token_data)
+    assert len(token) < len(JWTTokenStorage(mock_settings).encode_token(token_data))
+    decoded_token = storage.decode_token(token)
+    assert sorted(decoded_token.permissions) == sorted(token_data.permissions)
+
+    newer_registry = registry.extend(["resource200:read"])
+    newer_storage = JWTTokenStorage(settings, permission_registry=newer_registry)
+    assert newer_storage.decode_token(token).permissions == decoded_token.permissions
+    with pytest.raises(FastAuthException, match=r"400"):
+        storage.decode_token(newer_storage.encode_token(token_data))
+
+
+@pytest.mark.parametrize("algorithm", ["RS256", "ES256", "EdDSA"])
+def test_keyring_tokens(mock_settings, token_data, algorithm):
+    asymmetric = pytest.importorskip("cryptography.hazmat.primitives.asymmetric")
+    ec, ed25519, rsa = asymmetric.ec, asymmetric.ed25519, asymmetric.rsa
+    private_key = {
+        "RS256": lambda: rsa.generate_private_key(65537, 2048),
+        "ES256": lambda: ec.generate_private_key(ec.SECP256R1()),
+        "EdDSA": ed25519.Ed25519PrivateKey.generate,
+    }[algorithm]()
+    old_key = SigningKey("old", algorithm, private_key)
+    keyring = KeyRing([old_key])
+    storage = JWTTokenStorage(mock_settings, keyring=keyring)
+    old_token = storage.encode_token(token_data)
+
+    keyring.add(SigningKey("new", algorithm, private_key), active=True)
+    token = storage.encode_token(token_data)
+    assert storage.decode_token(token).user_id == "test"
+    assert storage.decode_token(old_token).user_id == "test"
+
+    # Verify-only storage knows only public key
+    verifier = JWTTokenStorage(
+        mock_settings,
+        keyring=KeyRing([SigningKey("new", algorithm, old_key.public_key)]),
+    )
+    assert verifier.decode_token(token).user_id == "test"
+    with pytest.raises(FastAuthException):
+        verifier.decode_token(old_token)
+    with pytest.raises(FastAuthException):
+        verifier.decode_token(JWTTokenStorage(mock_settings).encode_token(token_data))
+
+
+def test_keyring_removed_key_not_cached(mock_settings, token_data):
+    ed25519 = pytest.importorskip("cryptography.hazmat.primitives.asymmetric.ed25519")
+    keyring = KeyRing(
+        [SigningKey("old", "EdDSA", ed25519.Ed25519PrivateKey.generate())]
+    )
+    storage = JWTTokenStorage(mock_settings, cache=TTLCache(), keyring=keyring)
+    token = storage.encode_token(token_data)
+    assert storage.decode_token(token).user_id == "test"
+
+    # Compromised key is removed, cached token is verified again
+    keyring.add(
+        SigningKey("new", "EdDSA", ed25519.Ed25519PrivateKey.generate()), active=True
+    )
+    keyring.remove("old")
+    with pytest.raises(FastAuthException):
+        storage.decode_token(token)
+
+
+def test_keyring_without_cryptography():
+    with patch("fastauth.utils.keyring.get_default_algorithms", return_value={}):
+        with pytest.raises(ImportError, match=r"fastapi-fastauth\[keys\]"):
+            KeyRing()
@@ -0,0 +1,32 @@
+import time
+import pytest
+from fastauth.storage import InMemoryRevocationBackend, RevocationList
+
+
+@pytest.mark.asyncio
+async def test_revocation_list():
+    backend = InMemoryRevocationBackend()
+    revocation = RevocationList(backend, sync_interval=60)
+
+    await revocation.revoke("revoked", time.time() + 60)
+    await revocation.revoke("expired", time.time() - 1)
+
+    assert await revocation.is_revoked("revoked") is True
+    assert await revocation.is_revoked("expired") is False
+    assert await revocation.is_revoked("active") is False
+    assert len(revocation) == 1
+
+
+@pytest.mark.asyncio
+async def test_revocation_list_sync():
+    backend = InMemoryRevocationBackend()
+    first = RevocationList(backend, sync_interval=60)
+    second = RevocationList(backend, sync_interval=0)
+
+    assert await first.is_revoked("jti") is False
+    await second.revoke("jti", time.time() + 60)
+
+    # Synced less than sync_interval ago, answered from memory
+    assert await first.is_revoked("jti") is False
+    await first.sync()
+    assert await first.is_revoked("jti") is True
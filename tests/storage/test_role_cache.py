@@ -0,0 +1,130 @@
+import time
+import uuid
+from types import SimpleNamespace
+from unittest.mock import patch
+import pytest
+from fastauth.schemas.auth import TokenType
+from fastauth.services import BaseAuthService
+from fastauth.settings import FastAuthSettings
+from fastauth.storage import JWTTokenStorage, RolePermissionCache
+
+
+class AuthService(BaseAuthService):
+    pass
+
+
+class FakeRoleRepository:
+    def __init__(self, roles: dict[str, list[str]]):
+        self.roles = roles
+        self.queries = 0
+
+    async def get_many(self):
+        return await self.get_roles_by_list(list(self.roles))
+
+    async def get_roles_by_list(self, roles):
+        self.queries += 1
+        return [
+            SimpleNamespace(
+                name=name,
+                permissions=[
+                    SimpleNamespace(resource=p.split(":")[0], action=p.split(":")[1])
+                    for p in self.roles[name]
+                ],
+            )
+            for name in roles
+            if name in self.roles
+        ]
+
+
+@pytest.mark.asyncio
+async def test_role_permission_cache():
+    repo = FakeRoleRepository({"USER": ["users:read"], "ADMIN": ["users:*"]})
+    cache = RolePermissionCache()
+
+    permissions = await cache.get_permissions(["USER", "ADMIN", "GHOST"], repo)
+    assert sorted(permissions) == ["users:*", "users:read"]
+    assert await cache.get_permissions(["ADMIN", "USER", "GHOST"], repo) is permissions
+    assert await cache.get_permissions(["USER"], repo) == ["users:read"]
+    assert repo.queries == 1
+
+    repo.roles["USER"].append("posts:read")
+    cache.invalidate()
+    assert cache.version == 2
+    assert await cache.get_permissions(["USER"], repo) == ["users:read", "posts:read"]
+    assert repo.queries == 2
+
+    # token issued by process with newer roles
+    await cache.get_permissions(["USER"], repo, version=5)
+    assert cache.version == 5
+    assert repo.queries == 3
+
+
+@pytest.mark.asyncio
+async def test_role_permission_cache_warmup():
+    repo = FakeRoleRepository({"USER": ["users:read"], "ADMIN": ["users:*"]})
+    cache = RolePermissionCache()
+    await cache.warmup(repo)
+    assert repo.queries == 1
+
+    assert await cache.get_permissions(["USER"], repo) == ["users:read"]
+    assert await cache.get_permissions(["ADMIN"], repo) == ["users:*"]
+    assert repo.queries == 1
+
+    repo.roles["ADMIN"] = ["*:*"]
+    cache.invalidate("ADMIN")
+    assert await cache.get_permissions(["USER", "ADMIN"], repo) in (
+        ["users:read", "*:*"],
+        ["*:*", "users:read"],
+    )
+    assert repo.queries == 2
+
+
+def test_role_permission_cache_requires_ttl():
+    with pytest.raises(ValueError):
+        RolePermissionCache(ttl=None)
+
+
+@pytest.mark.asyncio
+async def test_verify_token_roles_format():
+    settings = FastAuthSettings(
+        SECRET_KEY="secret", ACCESS_TOKEN_PERMISSIONS_FORMAT="roles"
+    )
+    repo = FakeRoleRepository({"USER": ["users:read"]})
+    user = SimpleNamespace(
+        id=uuid.uuid4(), email="roles@example.com", roles=[SimpleNamespace(name="USER")]
+    )
+    # Two processes with their own caches
+    caches = [RolePermissionCache(ttl=30), RolePermissionCache(ttl=30)]
+    services = [
+        AuthService(
+            settings,
+            None,
+            JWTTokenStorage(settings),
+            role_repo=repo,
+            role_permission_cache=cache,
+        )
+        for cache in caches
+    ]
+
+    token = await services[0].create_access_token(user)
+    payload = await services[0].verify_token(token, TokenType.ACCESS)
+    assert payload.roles == ["USER"]
+    assert payload.permissions == ["users:read"]
+
+    # Role is changed in second process, first one sees newer version in token
+    repo.roles["USER"].append("posts:read")
+    caches[1].invalidate("USER")
+    token = await services[1].create_access_token(user)
+    for service in services:
+        payload = await service.verify_token(token, TokenType.ACCESS)
+        assert payload.permissions == ["users:read", "posts:read"]
+
+    # Old token verified by process which missed the change is stale until ttl
+    repo.roles["USER"].append("posts:write")
+    caches[0].invalidate("USER")
+    token = await services[1].create_access_token(user)
+    payload = await services[1].verify_token(token, TokenType.ACCESS)
+    assert payload.permissions == ["users:read", "posts:read"]
+    with patch("fastauth.utils.cache.time.time", return_value=time.time() + 31):
+        payload = await services[1].verify_token(token, TokenType.ACCESS)
+    assert payload.permissions == ["users:read", "posts:read", "posts:write"]
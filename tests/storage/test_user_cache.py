@@ -0,0 +1,60 @@
+from enum import StrEnum
+from types import SimpleNamespace
+import pytest
+from fastauth.storage import InMemoryUserCache, UserSnapshot
+
+
+class Status(StrEnum):
+    ACTIVE = "active"
+
+
+class Permission:
+    def __init__(self, resource: str, action: str):
+        self.resource = resource
+        self.action = action
+
+
+class Role:
+    def __init__(self, name: str, permissions: list[Permission]):
+        self.name = name
+        self.permissions = permissions
+
+
+class User:
+    def __init__(self):
+        self._sa_instance_state = object()
+        self.id = 1
+        self.email = "test@example.com"
+        self.status = Status.ACTIVE
+        self.roles = [Role("USER", [Permission("users", "read")])]
+
+
+@pytest.mark.asyncio
+async def test_user_cache_snapshot():
+    cache = InMemoryUserCache(maxsize=10, ttl=60)
+    user = User()
+    await cache.set(user.id, user)
+
+    snapshot = await cache.get(user.id)
+    assert isinstance(snapshot, UserSnapshot)
+    assert snapshot is not user
+    assert not hasattr(snapshot, "_sa_instance_state")
+    assert snapshot.status is Status.ACTIVE
+    assert snapshot.roles[0].name == "USER"
+    assert snapshot.roles[0].permissions[0].resource == "users"
+    assert cache.hits == 1
+
+    await cache.invalidate(user.id)
+    assert await cache.get(user.id) is None
+    assert cache.misses == 1
+
+
+@pytest.mark.asyncio
+async def test_user_cache_is_detached():
+    cache = InMemoryUserCache()
+    user = SimpleNamespace(id=1, email="before@example.com")
+    await cache.set(user.id, user)
+    user.email = "after@example.com"
+
+    snapshot = await cache.get(user.id)
+    assert snapshot.email == "before@example.com"
@@ -0,0 +1,126 @@
+import pytest
+from fastapi import FastAPI, Depends
+from httpx import AsyncClient, ASGITransport
+from fastauth import FastAuth
+from fastauth.routes import get_jwks_router
+from fastauth.schemas.auth import TokenData, TokenType
+from fastauth.services import BaseAuthService
+from fastauth.transport import BearerTransport
+from fastauth.utils.keyring import KeyRing, SigningKey
+
+
+class CountingService:
+    has_role = staticmethod(BaseAuthService.has_role)
+    has_permission = staticmethod(BaseAuthService.has_permission)
+    get_principal = BaseAuthService.get_principal
+
+    def __init__(self, settings):
+        self.settings = settings
+        self.verified = 0
+        self.authenticated = 0
+
+    async def verify_token(self, token: str, token_type: TokenType) -> TokenData:
+        self.verified += 1
+        return TokenData(
+            user_id="1", email="email", roles=["ADMIN"], token_type=token_type
+        )
+
+    def parse_user_id(self, value: str) -> int:
+        return int(value)
+
+    async def authenticate(self, payload: TokenData):
+        self.authenticated += 1
+        return {"id": payload.user_id}
+
+
+@pytest.fixture
+def service(mock_settings):
+    return CountingService(mock_settings)
+
+
+@pytest.fixture
+def security(mock_settings, service):
+    return FastAuth(mock_settings, lambda: service, BearerTransport(mock_settings))
+
+
+def test_dependencies_memoized(security):
+    assert security.get_current_user() is security.get_current_user()
+    assert security.get_access_token() is security.get_access_token()
+    assert security.require_role("ADMIN") is security.require_role("ADMIN")
+    assert security.require_role("ADMIN") is not security.require_role("USER")
+    assert security.require_all_permissions(["a", "b"]) is (
+        security.require_all_permissions(["a", "b"])
+    )
+
+
+@pytest.mark.asyncio
+async def test_token_decoded_once_per_request(security, service):
+    app = FastAPI()
+
+    @app.get("/", dependencies=[Depends(security.require_role("ADMIN"))])
+    async def route(user=Depends(security.get_current_user())):
+        return user
+
+    async with AsyncClient(
+        transport=ASGITransport(app=app), base_url="http://test"
+    ) as client:
+        response = await client.get("/", headers={"Authorization": "Bearer token"})
+
+    assert response.json() == {"id": "1"}
+    assert service.verified == 1
+    assert service.authenticated == 1
+
+
+@pytest.mark.asyncio
+async def test_stateless_authorization(security, service):
+    app = FastAPI()
+
+    @app.get("/")
+    async def route(user=Depends(security.require_role("ADMIN", stateless=True))):
+        return {"id": user.id, "roles": user.roles}
+
+    async with AsyncClient(
+        transport=ASGITransport(app=app), base_url="http://test"
+    ) as client:
+        response = await client.get("/", headers={"Authorization": "Bearer token"})
+
+    assert response.json() == {"id": 1, "roles": ["ADMIN"]}
+    assert service.authenticated == 0
+
+
+@pytest.mark.asyncio
+async def test_jwks_router(security, mock_settings):
+    ed25519 = pytest.importorskip("cryptography.hazmat.primitives.asymmetric.ed25519")
+    keyring = KeyRing([SigningKey("k1", "EdDSA", ed25519.Ed25519PrivateKey.generate())])
+    app = FastAPI()
+    app.include_router(get_jwks_router(security, keyring))
+
+    async with AsyncClient(
+        transport=ASGITransport(app=app), base_url="http://test"
+    ) as client:
+        response = await client.get(mock_settings.JWKS_URL)
+        assert response.status_code == 200
+        assert [key["kid"] for key in response.json()["keys"]] == ["k1"]
+        assert "d" not in response.json()["keys"][0]
+
+        etag = response.headers["etag"]
+        response = await client.get(
+            mock_settings.JWKS_URL, headers={"If-None-Match": etag}
+        )
+        assert response.status_code == 304
+        for if_none_match in ["*", f"W/{etag}", f'"other", {etag}']:
+            response = await client.get(
+                mock_settings.JWKS_URL, headers={"If-None-Match": if_none_match}
+            )
+            assert response.status_code == 304
+        response = await client.get(
+            mock_settings.JWKS_URL, headers={"If-None-Match": '"other"'}
+        )
+        assert response.status_code == 200
+
+        keyring.add(SigningKey("k2", "EdDSA", ed25519.Ed25519PrivateKey.generate()))
+        response = await client.get(
+            mock_settings.JWKS_URL, headers={"If-None-Match": etag}
+        )
+        assert response.status_code == 200
+        assert len(response.json()["keys"]) == 2
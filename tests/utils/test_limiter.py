@@ -0,0 +1,51 @@
+import pytest
+from pydantic import ValidationError
+from fastauth.exceptions import FastAuthException
+from fastauth.services import BaseAuthService
+from fastauth.settings import FastAuthSettings
+from fastauth.storage import JWTTokenStorage
+from fastauth.utils.limiter import ConcurrencyLimiter, get_password_hash_limiter
+from fastauth.utils.password import AsyncPasswordHelper
+
+
+class AuthService(BaseAuthService):
+    pass
+
+
+@pytest.mark.asyncio
+async def test_concurrency_limiter():
+    limiter = ConcurrencyLimiter(1, retry_after=5, status_code=429)
+    async with limiter:
+        with pytest.raises(FastAuthException) as exc:
+            async with limiter:
+                pass
+    assert exc.value.code == 429
+    assert exc.value.headers["Retry-After"] == "5"
+    assert limiter.active == 0
+    assert limiter.rejected == 1
+
+    async with limiter:
+        assert limiter.active == 1
+
+
+def test_password_hash_limiter_is_shared(mock_settings):
+    assert get_password_hash_limiter(mock_settings) is None
+
+    mock_settings.PASSWORD_HASH_MAX_CONCURRENCY = 2
+    limiter = get_password_hash_limiter(mock_settings)
+    assert limiter.max_concurrency == 2
+    assert get_password_hash_limiter(mock_settings) is limiter
+
+
+def test_password_hash_limiter_requires_async_helper():
+    settings = FastAuthSettings(PASSWORD_HASH_MAX_CONCURRENCY=4)
+    with pytest.raises(RuntimeError, match="AsyncPasswordHelper"):
+        AuthService(settings, None, JWTTokenStorage(settings))
+
+    service = AuthService(
+        settings, None, JWTTokenStorage(settings), password_helper=AsyncPasswordHelper()
+    )
+    assert service.password_hash_limiter.max_concurrency == 4
+
+    with pytest.raises(ValidationError):
+        FastAuthSettings(PASSWORD_HASH_OVERLOAD_STATUS_CODE=200)
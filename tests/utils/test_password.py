@@ -0,0 +1,70 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+from fastauth.settings import FastAuthSettings
+from fastauth.utils.password import (
+    AsyncPasswordHelper,
+    PasswordHelper,
+    calibrate_argon2,
+    describe_hash,
+    password_fingerprint,
+)
+
+
+@pytest.mark.asyncio
+async def test_async_password_helper():
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        helper = AsyncPasswordHelper(executor=executor, max_pending=2)
+        hashes = await asyncio.gather(*(helper.hash(f"pass{i}") for i in range(4)))
+        valid, new_hash = await helper.verify_and_update("pass0", hashes[0])
+
+    assert valid is True
+    assert new_hash is None
+    assert helper.calls == 5
+    assert helper.queue_wait_max > 0
+    assert helper.queue_wait_avg <= helper.queue_wait_max
+
+
+def test_password_fingerprint():
+    fingerprint = password_fingerprint("secret", "$argon2id$hash")
+    assert fingerprint == password_fingerprint("secret", "$argon2id$hash")
+    assert fingerprint != password_fingerprint("secret", "$argon2id$other")
+    assert fingerprint != password_fingerprint("other", "$argon2id$hash")
+
+
+def test_calibrate_argon2():
+    settings = FastAuthSettings(
+        PASSWORD_HASH_TARGET_MS=5,
+        PASSWORD_HASH_MAX_MEMORY_KIB=1024,
+        PASSWORD_HASH_MAX_PARALLELISM=1,
+    )
+    helper = PasswordHelper(password_hash=calibrate_argon2(settings, samples=1))
+    hashed = helper.hash("test")
+
+    scheme, params = describe_hash(hashed)
+    assert scheme == "argon2id"
+    assert "m=1024" in params and params.endswith("p=1")
+    assert helper.verify_and_update("test", hashed) == (True, None)
+    assert helper.needs_rehash(PasswordHelper().hash("test"))
+
+
+def test_calibrate_argon2_coarse_and_pinned():
+    settings = FastAuthSettings(
+        PASSWORD_HASH_TARGET_MS=5,
+        PASSWORD_HASH_MAX_MEMORY_KIB=1500,
+        PASSWORD_HASH_MAX_PARALLELISM=3,
+    )
+    hashed = calibrate_argon2(settings, samples=1).hash("test")
+    params = dict(p.split("=") for p in describe_hash(hashed)[1].split(","))
+    for key in ("m", "t", "p"):
+        # Powers of two
+        assert int(params[key]) & (int(params[key]) - 1) == 0
+    assert int(params["m"]) <= 1024 and int(params["p"]) <= 2
+
+    # Parameters pinned for all nodes are used without benchmark
+    pinned = FastAuthSettings(PASSWORD_HASH_ARGON2_PARAMS=describe_hash(hashed)[1])
+    hashed = calibrate_argon2(pinned).hash("test")
+    assert describe_hash(hashed)[1] == pinned.PASSWORD_HASH_ARGON2_PARAMS
+
+    with pytest.raises(ValueError):
+        calibrate_argon2(FastAuthSettings(PASSWORD_HASH_ARGON2_PARAMS="m=1"))
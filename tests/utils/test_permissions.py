@@ -0,0 +1,35 @@
+from fastauth.schemas.auth import TokenClaims, TokenType
+from fastauth.utils.permissions import PermissionIndex
+
+
+def test_permission_index_exact_and_wildcards():
+    index = PermissionIndex(
+        ["users:read", "posts:*", "*:list"], roles=["USER", "ADMIN"]
+    )
+    assert index.has_permission("users:read")
+    assert not index.has_permission("users:delete")
+    assert index.has_permission("posts:delete")
+    assert index.has_permission("comments:list")
+    assert index.has_all_permissions(["users:read", "posts:create", "users:list"])
+    assert not index.has_all_permissions(["users:read", "users:write"])
+    assert index.has_any_permission(["users:write", "posts:write"])
+    assert index.has_role("ADMIN")
+    assert not index.has_role("OWNER")
+
+
+def test_permission_index_superuser():
+    index = PermissionIndex(["*:*"])
+    assert "anything:at-all" in index
+
+
+def test_permission_index_cached_on_token():
+    token = TokenClaims(
+        user_id="1",
+        email="test@example.com",
+        roles=["USER"],
+        permissions=["users:*"],
+        token_type=TokenType.ACCESS,
+    )
+    assert token.permission_index is token.permission_index
+    assert token.permission_index.has_permission("users:read")
+    assert "_permission_index" not in token.model_dump()
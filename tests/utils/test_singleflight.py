@@ -0,0 +1,65 @@
+import asyncio
+from types import SimpleNamespace
+import pytest
+from fastauth.repositories import SingleFlightUserMixin
+from fastauth.storage import UserSnapshot
+from fastauth.utils.singleflight import SingleFlight
+
+
+class FakeUserRepository:
+    queries = 0
+
+    async def get_by_pk(self, pk, **kwargs):
+        FakeUserRepository.queries += 1
+        await asyncio.sleep(0.01)
+        return SimpleNamespace(id=pk, email="test@example.com")
+
+    async def get_by_login_fields(self, login_fields, value, **kwargs):
+        raise ValueError("Not found")
+
+
+class UserRepository(SingleFlightUserMixin, FakeUserRepository):
+    single_flight = SingleFlight()
+
+
+@pytest.mark.asyncio
+async def test_single_flight_user_repository():
+    users = await asyncio.gather(*(UserRepository().get_by_pk(1) for _ in range(5)))
+
+    assert FakeUserRepository.queries == 1
+    assert UserRepository.single_flight.calls == 1
+    assert UserRepository.single_flight.coalesced == 4
+    assert sum(isinstance(user, UserSnapshot) for user in users) == 4
+    assert all(user.id == 1 for user in users)
+
+    with pytest.raises(ValueError):
+        await asyncio.gather(
+            *(UserRepository().get_by_login_fields(["email"], "x") for _ in range(2))
+        )
+
+
+@pytest.mark.asyncio
+async def test_single_flight_leader_cancelled():
+    single_flight = SingleFlight()
+    calls = []
+
+    async def func(name):
+        calls.append(name)
+        await asyncio.sleep(0.01)
+        return name
+
+    leader = asyncio.create_task(single_flight.do("key", lambda: func("leader")))
+    await asyncio.sleep(0)
+    waiters = [
+        asyncio.create_task(single_flight.do("key", lambda: func("waiter")))
+        for _ in range(2)
+    ]
+    await asyncio.sleep(0)
+    leader.cancel()
+
+    # One waiter repeats the call, another one joins it
+    assert await asyncio.gather(*waiters) == ["waiter", "waiter"]
+    assert calls == ["leader", "waiter"]
+    assert leader.cancelled()
+    assert single_flight.coalesced == 1
+    assert not single_flight.in_flight("key")